@@ -1,15 +1,66 @@
 """Performance analysis module for F1 Fantasy data."""
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple, Union
 
 import numpy as np
-import polars as pl
 
 from backend.data.models import Driver, Team
 
 logger = logging.getLogger(__name__)
 
+# Prices are usually quoted to one decimal place, so scaling by 10 makes them exact
+# integers; finer prices get a finer scale, up to MAX_PRICE_SCALE
+PRICE_SCALE = 10
+
+# Finest scale tried; prices with more decimal places are rounded up, which keeps
+# every selection within budget at the cost of exactness
+MAX_PRICE_SCALE = 10_000
+
+# Largest knapsack table (drivers x slots x budget steps) solved exactly; bigger
+# problems fall back to the enumerated greedy approximation
+MAX_DP_CELLS = 5_000_000
+
+# Seed sets for the approximate selection are drawn from this many of the best
+# drivers by value and as many by points, which keeps its cost near-linear in the
+# number of drivers
+MAX_SEED_DRIVERS = 20
+
+
+def price_scale(*prices: np.ndarray) -> int:
+    """Find the smallest power of ten, at least PRICE_SCALE, that makes all prices integers.
+
+    Args:
+        prices: Arrays of prices
+
+    Returns:
+        Factor to multiply prices by before rounding them to integer costs
+    """
+    values = np.concatenate([np.ravel(p).astype(np.float64) for p in prices])
+    scale = PRICE_SCALE
+    while scale < MAX_PRICE_SCALE:
+        scaled = values * scale
+        if np.allclose(scaled, np.rint(scaled), rtol=0, atol=1e-6):
+            break
+        scale *= 10
+    return scale
+
+
+def scale_prices(prices: np.ndarray, scale: int) -> np.ndarray:
+    """Convert prices to integer costs, rounding any remainder up.
+
+    Rounding up means a selection whose costs fit the scaled budget can never
+    overspend the real one.
+
+    Args:
+        prices: Array of prices
+        scale: Factor from price_scale()
+
+    Returns:
+        Array of non-negative integer costs
+    """
+    return np.maximum(np.ceil(np.asarray(prices) * scale - 1e-6), 0).astype(np.int64)
+
 
 def calculate_value_efficiency(driver: Driver) -> float:
     """Calculate the points per million spent for a driver.
@@ -20,10 +71,7 @@ def calculate_value_efficiency(driver: Driver) -> float:
     Returns:
         Points per million spent
     """
-    if driver.price <= 0:
-        return 0.0
-    
-    return driver.points / driver.price
+    return driver.value
 
 
 def calculate_team_value_efficiency(team: Team) -> float:
@@ -35,10 +83,7 @@ def calculate_team_value_efficiency(team: Team) -> float:
     Returns:
         Points per million spent
     """
-    if team.price <= 0:
-        return 0.0
-    
-    return team.points / team.price
+    return team.value
 
 
 def rank_drivers_by_value(drivers: List[Driver]) -> List[Tuple[Driver, float]]:
@@ -50,8 +95,7 @@ def rank_drivers_by_value(drivers: List[Driver]) -> List[Tuple[Driver, float]]:
     Returns:
         List of tuples containing (Driver, value_efficiency) sorted by value efficiency
     """
-    driver_values = [(driver, calculate_value_efficiency(driver)) for driver in drivers]
-    return sorted(driver_values, key=lambda x: x[1], reverse=True)
+    return _rank_by_value(drivers)
 
 
 def rank_teams_by_value(teams: List[Team]) -> List[Tuple[Team, float]]:
@@ -63,8 +107,27 @@ def rank_teams_by_value(teams: List[Team]) -> List[Tuple[Team, float]]:
     Returns:
         List of tuples containing (Team, value_efficiency) sorted by value efficiency
     """
-    team_values = [(team, calculate_team_value_efficiency(team)) for team in teams]
-    return sorted(team_values, key=lambda x: x[1], reverse=True)
+    return _rank_by_value(teams)
+
+
+def _rank_by_value(
+    items: Sequence[Union[Driver, Team]],
+) -> List[Tuple[Union[Driver, Team], float]]:
+    """Rank drivers or teams by value efficiency in one vectorized pass.
+
+    Args:
+        items: List of Driver or Team objects
+
+    Returns:
+        List of tuples containing (item, value_efficiency) sorted by value efficiency
+    """
+    values = np.fromiter((item.value for item in items), dtype=np.float64, count=len(items))
+    # Stable sort on the negated values keeps input order for ties, like sorted()
+    order = np.argsort(-values, kind="stable")
+    return [
+        (items[i], value)
+        for i, value in zip(order.tolist(), values[order].tolist(), strict=True)
+    ]
 
 
 def analyze_form_trends(drivers: List[Driver]) -> Dict[str, float]:
@@ -76,31 +139,224 @@ def analyze_form_trends(drivers: List[Driver]) -> Dict[str, float]:
     Returns:
         Dictionary mapping driver names to their form trend (last 3 races)
     """
-    trends = {}
-    
+    trends = {driver.name: 0.0 for driver in drivers}
+
+    # Group drivers by how many recent races they have so each group can be
+    # fitted with one batched least-squares slope instead of a polyfit per driver
+    buckets: Dict[int, List[Driver]] = {}
     for driver in drivers:
-        # Get the last 3 races if available
-        recent_races = driver.race_history[-3:] if len(driver.race_history) >= 3 else driver.race_history
-        
-        if recent_races:
-            # Calculate the trend (positive or negative)
-            if len(recent_races) >= 2:
-                # Simple linear regression slope
-                x = np.arange(len(recent_races))
-                slope, _ = np.polyfit(x, recent_races, 1)
-                trends[driver.name] = slope
-            else:
-                trends[driver.name] = 0.0
-        else:
-            trends[driver.name] = 0.0
-    
+        recent_count = min(len(driver.race_history), 3)
+        if recent_count >= 2:
+            buckets.setdefault(recent_count, []).append(driver)
+
+    for recent_count, bucket in buckets.items():
+        y = np.stack([d.race_history_array[-recent_count:] for d in bucket])
+        x = np.arange(recent_count, dtype=np.float64)
+        x_centered = x - x.mean()
+        slopes = ((y - y.mean(axis=1, keepdims=True)) * x_centered).sum(axis=1) / (
+            x_centered**2
+        ).sum()
+        trends.update(zip((d.name for d in bucket), slopes.tolist(), strict=True))
+
     return trends
 
 
+def _drivers_to_soa(
+    drivers: Sequence[Union[Driver, Team]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[int, Union[Driver, Team]]]:
+    """Split a list of drivers (or teams) into parallel NumPy arrays.
+
+    Args:
+        drivers: List of Driver or Team objects
+
+    Returns:
+        Tuple containing (ids, prices, points, index_map) where index_map maps id to object
+    """
+    ids = np.fromiter((d.id for d in drivers), dtype=np.int64, count=len(drivers))
+    prices = np.fromiter((d.price for d in drivers), dtype=np.float64, count=len(drivers))
+    points = np.fromiter((d.points for d in drivers), dtype=np.float64, count=len(drivers))
+    index_map = {d.id: d for d in drivers}
+    return ids, prices, points, index_map
+
+
+def _greedy_extend(
+    order: np.ndarray,
+    prices: np.ndarray,
+    budget: float,
+    max_drivers: int,
+    seed: Tuple[int, ...] = (),
+) -> List[int]:
+    """Extend a seed selection greedily in the given order while budget allows.
+
+    Args:
+        order: Driver indices in preference order
+        prices: Array of driver prices
+        budget: Budget available for drivers
+        max_drivers: Maximum number of drivers to select
+        seed: Driver indices that are already selected
+
+    Returns:
+        List of selected driver indices
+    """
+    selected = list(seed)
+    remaining = budget - prices[selected].sum()
+    for i in order.tolist():
+        if len(selected) >= max_drivers:
+            break
+        if i not in seed and prices[i] <= remaining + 1e-9:
+            selected.append(i)
+            remaining -= prices[i]
+    return selected
+
+
+def _greedy_by_value(
+    prices: np.ndarray, points: np.ndarray, budget: float, max_drivers: int
+) -> List[int]:
+    """Greedy driver selection by points per million."""
+    values = np.divide(points, prices, out=np.full_like(points, np.inf), where=prices > 0)
+    return _greedy_extend(np.argsort(-values, kind="stable"), prices, budget, max_drivers)
+
+
+def _greedy_by_gain(
+    prices: np.ndarray, points: np.ndarray, budget: float, max_drivers: int
+) -> List[int]:
+    """Greedy driver selection by absolute points."""
+    return _greedy_extend(np.argsort(-points, kind="stable"), prices, budget, max_drivers)
+
+
+def _greedy_by_lagrangian(
+    prices: np.ndarray, points: np.ndarray, budget: float, max_drivers: int, iterations: int = 40
+) -> List[int]:
+    """Greedy driver selection by Lagrangian-relaxed score ``points - lam * price``.
+
+    Bisects the price multiplier ``lam`` for the smallest penalty whose top
+    ``max_drivers`` positive scores fit the budget, then tops up any leftover
+    budget by value.
+
+    Args:
+        prices: Array of driver prices
+        points: Array of driver points
+        budget: Budget available for drivers
+        max_drivers: Maximum number of drivers to select
+        iterations: Number of bisection steps on the multiplier
+
+    Returns:
+        List of selected driver indices
+    """
+    if max_drivers <= 0 or not len(prices):
+        return []
+
+    def pick(lam: float) -> np.ndarray:
+        scores = points - lam * prices
+        top = np.argsort(-scores, kind="stable")[:max_drivers]
+        return top[scores[top] > 0]
+
+    values = np.divide(points, prices, out=np.full_like(points, np.inf), where=prices > 0)
+    finite = values[np.isfinite(values)]
+    # At the best points-per-million ratio no priced driver has a positive score
+    lo, hi = 0.0, (max(float(finite.max()), 0.0) if finite.size else 0.0)
+    selected = pick(lo)
+    if prices[selected].sum() > budget + 1e-9:
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            if prices[pick(mid)].sum() <= budget + 1e-9:
+                hi = mid
+            else:
+                lo = mid
+        selected = pick(hi)
+
+    order = np.argsort(-values, kind="stable")
+    return _greedy_extend(order, prices, budget, max_drivers, tuple(selected.tolist()))
+
+
+def _approximate_driver_selection(
+    prices: np.ndarray, points: np.ndarray, budget: float, max_drivers: int
+) -> List[int]:
+    """Approximate the best driver selection by partial enumeration.
+
+    Takes the best of the value, gain and Lagrangian greedy rules and of every
+    affordable seed set of up to two drivers, drawn from the best MAX_SEED_DRIVERS
+    by value and by points, completed greedily by value.
+
+    Args:
+        prices: Array of driver prices
+        points: Array of driver points
+        budget: Budget available for drivers
+        max_drivers: Maximum number of drivers to select
+
+    Returns:
+        List of selected driver indices
+    """
+    values = np.divide(points, prices, out=np.full_like(points, np.inf), where=prices > 0)
+    order = np.argsort(-values, kind="stable")
+    candidates = [
+        _greedy_by_value(prices, points, budget, max_drivers),
+        _greedy_by_gain(prices, points, budget, max_drivers),
+        _greedy_by_lagrangian(prices, points, budget, max_drivers),
+    ]
+
+    n = len(prices)
+    affordable = prices <= budget + 1e-9
+    by_value = order[affordable[order]][:MAX_SEED_DRIVERS]
+    by_points = np.argsort(-points, kind="stable")
+    by_points = by_points[affordable[by_points]][:MAX_SEED_DRIVERS]
+    seeds = np.union1d(by_value, by_points)
+    if max_drivers >= 1:
+        for i in seeds.tolist():
+            candidates.append(_greedy_extend(order, prices, budget, max_drivers, (i,)))
+    if max_drivers >= 2:
+        seed_prices = prices[seeds]
+        pair_cost = seed_prices[:, None] + seed_prices[None, :]
+        first, second = np.nonzero(np.triu(pair_cost <= budget + 1e-9, k=1))
+        for i, j in zip(seeds[first].tolist(), seeds[second].tolist(), strict=True):
+            candidates.append(_greedy_extend(order, prices, budget, max_drivers, (i, j)))
+
+    return max(candidates, key=lambda selected: points[selected].sum()) if n else []
+
+
+def _approximate_team_selection(
+    drivers: List[Driver], teams: List[Team], budget: float, max_drivers: int
+) -> Tuple[List[Driver], Team, float]:
+    """Team selection for budgets too fine-grained for the exact knapsack.
+
+    Args:
+        drivers: List of Driver objects
+        teams: List of Team objects
+        budget: Total budget available
+        max_drivers: Maximum number of drivers to select
+
+    Returns:
+        Tuple containing (selected_drivers, selected_team, remaining_budget)
+    """
+    _, prices, points, _ = _drivers_to_soa(drivers)
+    options = [team for team in teams if team.price <= budget] or [None]
+
+    best_total, best_team, best_indices = -np.inf, None, []
+    for team in options:
+        team_price = team.price if team else 0.0
+        indices = _approximate_driver_selection(prices, points, budget - team_price, max_drivers)
+        total = (team.points if team else 0.0) + points[indices].sum()
+        if total > best_total:
+            best_total, best_team, best_indices = total, team, indices
+
+    selected_drivers = [drivers[i] for i in best_indices]
+    remaining_budget = budget - (best_team.price if best_team else 0)
+    remaining_budget -= float(prices[best_indices].sum())
+    return selected_drivers, best_team, remaining_budget
+
+
 def optimal_team_selection(
     drivers: List[Driver], teams: List[Team], budget: float = 100.0, max_drivers: int = 5
 ) -> Tuple[List[Driver], Team, float]:
-    """Select the optimal team based on value efficiency within budget constraints.
+    """Select the points-maximising team within budget constraints.
+
+    Solves the budget/cardinality constrained selection exactly as a 0/1 knapsack
+    over prices scaled to integers by their number of decimal places. ``dp[k, c]``
+    holds the best points achievable with exactly ``k`` drivers costing at most
+    ``c``; the best constructor is then chosen against the remaining capacity. If
+    the budget-free optimum is already affordable it is returned without building
+    the table. Budgets too large for the table fall back to greedy selection with
+    partial enumeration of seed sets.
 
     Args:
         drivers: List of Driver objects
@@ -111,50 +367,78 @@ def optimal_team_selection(
     Returns:
         Tuple containing (selected_drivers, selected_team, remaining_budget)
     """
-    # Convert to Polars DataFrames for more efficient processing
-    driver_data = pl.DataFrame([
-        {
-            "id": d.id,
-            "name": d.name,
-            "price": d.price,
-            "points": d.points,
-            "value": calculate_value_efficiency(d)
-        }
-        for d in drivers
-    ])
-    
-    team_data = pl.DataFrame([
-        {
-            "id": t.id,
-            "name": t.name,
-            "price": t.price,
-            "points": t.points,
-            "value": calculate_team_value_efficiency(t)
-        }
-        for t in teams
-    ])
-    
-    # Sort by value efficiency
-    driver_data = driver_data.sort("value", descending=True)
-    team_data = team_data.sort("value", descending=True)
-    
-    # Start with the best team
-    selected_team = next((t for t in teams if t.id == team_data[0, "id"]), None) if not team_data.is_empty() else None
-    remaining_budget = budget - (selected_team.price if selected_team else 0)
-    
-    # Select drivers greedily by value within budget
-    selected_drivers = []
-    for row in driver_data.iter_rows(named=True):
-        if len(selected_drivers) >= max_drivers:
+    if budget < 0:
+        return [], None, budget
+
+    ids, prices, points, driver_map = _drivers_to_soa(drivers)
+    team_ids, team_prices, team_points, team_map = _drivers_to_soa(teams)
+    n = len(ids)
+
+    scale = price_scale(prices, team_prices)
+    capacity = int(np.floor(budget * scale + 1e-9))
+    costs = scale_prices(prices, scale)
+    team_costs = scale_prices(team_prices, scale)
+    affordable = np.flatnonzero(team_costs <= capacity)
+
+    # Ignoring the budget, the best line-up is the top scorers with the top constructor.
+    # That bound is the optimum whenever it happens to be affordable, so skip the search
+    top = np.sort(np.argsort(-points, kind="stable")[:max_drivers])
+    top = top[points[top] > 0]
+    top_team = affordable[int(np.argmax(team_points[affordable]))] if affordable.size else None
+    top_team_cost = int(team_costs[top_team]) if top_team is not None else 0
+    if int(costs[top].sum()) + top_team_cost <= capacity:
+        selected_team = team_map[int(team_ids[top_team])] if top_team is not None else None
+        remaining_budget = budget - (selected_team.price if selected_team else 0)
+        remaining_budget -= float(prices[top].sum())
+        return [driver_map[int(ids[i])] for i in top], selected_team, remaining_budget
+
+    # Whenever a constructor is affordable one is always picked, so the drivers can
+    # never use more than what is left after the cheapest one
+    driver_capacity = capacity - int(team_costs[affordable].min()) if affordable.size else capacity
+
+    if n * (max_drivers + 1) * (driver_capacity + 1) > MAX_DP_CELLS:
+        logger.debug("Knapsack table too large, using approximate team selection")
+        return _approximate_team_selection(drivers, teams, budget, max_drivers)
+
+    # dp[k, c]: best points using exactly k drivers with total cost <= c
+    dp = np.full((max_drivers + 1, driver_capacity + 1), -np.inf)
+    dp[0, :] = 0.0
+    keep = np.zeros((n, max_drivers + 1, driver_capacity + 1), dtype=bool)
+
+    for i in range(n):
+        w = costs[i]
+        if w > driver_capacity:
+            continue
+        # Update every cardinality row at once from the previous item's table
+        candidate = dp[:-1, : driver_capacity + 1 - w] + points[i]
+        improved = candidate > dp[1:, w:]
+        dp[1:, w:] = np.where(improved, candidate, dp[1:, w:])
+        keep[i, 1:, w:] = improved
+
+    # Pick the constructor that leaves the most valuable driver line-up
+    selected_team = None
+    best_k, best_c = int(np.argmax(dp[:, driver_capacity])), driver_capacity
+    if affordable.size:
+        remaining = capacity - team_costs[affordable]
+        totals = team_points[affordable] + dp[:, remaining].max(axis=0)
+        best = int(np.argmax(totals))
+        selected_team = team_map[int(team_ids[affordable[best]])]
+        best_c = int(remaining[best])
+        best_k = int(np.argmax(dp[:, best_c]))
+
+    # Walk the keep table backwards to recover the chosen drivers
+    selected_indices = []
+    k, c = best_k, best_c
+    for i in range(n - 1, -1, -1):
+        if k == 0:
             break
-            
-        driver_id = row["id"]
-        driver_price = row["price"]
-        
-        if driver_price <= remaining_budget:
-            driver = next((d for d in drivers if d.id == driver_id), None)
-            if driver:
-                selected_drivers.append(driver)
-                remaining_budget -= driver_price
-    
-    return selected_drivers, selected_team, remaining_budget 
\ No newline at end of file
+        if keep[i, k, c]:
+            selected_indices.append(i)
+            c -= costs[i]
+            k -= 1
+    selected_drivers = [driver_map[int(ids[i])] for i in reversed(selected_indices)]
+
+    remaining_budget = budget - (selected_team.price if selected_team else 0)
+    remaining_budget -= float(prices[selected_indices].sum())
+
+    return selected_drivers, selected_team, remaining_budget
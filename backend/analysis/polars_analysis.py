@@ -1,59 +1,102 @@
 """Advanced analysis module using Polars for F1 Fantasy data."""
 
 import logging
+import math
+from itertools import combinations
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import polars as pl
 
+from backend.analysis.performance import MAX_DP_CELLS, price_scale, scale_prices
 from backend.data.models import Driver, Race, Team
 
 logger = logging.getLogger(__name__)
 
+# Column types of the frames built from the data models
+DRIVER_SCHEMA = {
+    "id": pl.Int64,
+    "name": pl.String,
+    "team": pl.String,
+    "price": pl.Float64,
+    "points": pl.Float64,
+    "form": pl.Float64,
+    "race_history": pl.List(pl.Float64),
+}
+TEAM_SCHEMA = {
+    "id": pl.Int64,
+    "name": pl.String,
+    "price": pl.Float64,
+    "points": pl.Float64,
+    "form": pl.Float64,
+    "race_history": pl.List(pl.Float64),
+}
+# Points per million spent, zero for a non-positive price as in the data models
+VALUE_EXPR = (
+    pl.when(pl.col("price") > 0).then(pl.col("points") / pl.col("price")).otherwise(0.0)
+).alias("value")
 
-def create_driver_dataframe(drivers: List[Driver]) -> pl.DataFrame:
+RACE_SCHEMA = {
+    "id": pl.Int64,
+    "name": pl.String,
+    "circuit": pl.String,
+    "date": pl.Datetime,
+    "country": pl.String,
+    "completed": pl.Boolean,
+}
+
+
+def create_driver_dataframe(drivers: List[Driver], include_history: bool = False) -> pl.DataFrame:
     """Create a Polars DataFrame from a list of Driver objects.
     
     Args:
         drivers: List of Driver objects
+        include_history: Whether to include the race_history list column, which none
+            of the analysis functions read
         
     Returns:
-        Polars DataFrame with driver data
+        Polars DataFrame with driver data and a precomputed value column; a missing
+        form is null
     """
-    return pl.DataFrame([
-        {
-            "id": d.id,
-            "name": d.name,
-            "team": d.team,
-            "price": d.price,
-            "points": d.points,
-            "form": d.form if d.form is not None else float('nan'),
-            "race_history": d.race_history
-        }
-        for d in drivers
-    ])
-
-
-def create_team_dataframe(teams: List[Team]) -> pl.DataFrame:
+    columns = {
+        "id": [d.id for d in drivers],
+        "name": [d.name for d in drivers],
+        "team": [d.team for d in drivers],
+        "price": [d.price for d in drivers],
+        "points": [d.points for d in drivers],
+        "form": [d.form for d in drivers],
+    }
+    if include_history:
+        columns["race_history"] = [d.race_history for d in drivers]
+    
+    schema = {name: DRIVER_SCHEMA[name] for name in columns}
+    return pl.DataFrame(columns, schema=schema).with_columns(VALUE_EXPR)
+
+
+def create_team_dataframe(teams: List[Team], include_history: bool = False) -> pl.DataFrame:
     """Create a Polars DataFrame from a list of Team objects.
     
     Args:
         teams: List of Team objects
+        include_history: Whether to include the race_history list column, which none
+            of the analysis functions read
         
     Returns:
-        Polars DataFrame with team data
+        Polars DataFrame with team data and a precomputed value column; a missing
+        form is null
     """
-    return pl.DataFrame([
-        {
-            "id": t.id,
-            "name": t.name,
-            "price": t.price,
-            "points": t.points,
-            "form": t.form if t.form is not None else float('nan'),
-            "race_history": t.race_history
-        }
-        for t in teams
-    ])
+    columns = {
+        "id": [t.id for t in teams],
+        "name": [t.name for t in teams],
+        "price": [t.price for t in teams],
+        "points": [t.points for t in teams],
+        "form": [t.form for t in teams],
+    }
+    if include_history:
+        columns["race_history"] = [t.race_history for t in teams]
+    
+    schema = {name: TEAM_SCHEMA[name] for name in columns}
+    return pl.DataFrame(columns, schema=schema).with_columns(VALUE_EXPR)
 
 
 def create_race_dataframe(races: List[Race]) -> pl.DataFrame:
@@ -65,36 +108,95 @@ def create_race_dataframe(races: List[Race]) -> pl.DataFrame:
     Returns:
         Polars DataFrame with race data
     """
-    return pl.DataFrame([
+    return pl.DataFrame(
         {
-            "id": r.id,
-            "name": r.name,
-            "circuit": r.circuit,
-            "date": r.date,
-            "country": r.country,
-            "completed": r.completed
-        }
-        for r in races
-    ])
-
-
-def analyze_team_performance(drivers_df: pl.DataFrame) -> pl.DataFrame:
+            "id": [r.id for r in races],
+            "name": [r.name for r in races],
+            "circuit": [r.circuit for r in races],
+            "date": [r.date for r in races],
+            "country": [r.country for r in races],
+            "completed": [r.completed for r in races],
+        },
+        schema=RACE_SCHEMA,
+    )
+
+
+def _team_performance_plan(
+    drivers_lf: pl.LazyFrame, top_n: Optional[int] = None
+) -> pl.LazyFrame:
+    """Build the lazy query behind analyze_team_performance.
+    
+    Args:
+        drivers_lf: Polars LazyFrame with driver data
+        top_n: Only keep this many teams with the most total points, if given
+        
+    Returns:
+        Polars LazyFrame with team performance metrics, best teams first
+    """
+    # Aggregate without maintain_order so Polars can hash-aggregate in parallel;
+    # the order comes from the sort on the (small) grouped result instead. The
+    # average is derived from the sum and count rather than a second pass over points
+    performance_lf = (
+        drivers_lf
+        .group_by("team")
+        .agg([
+            pl.len().alias("driver_count"),
+            pl.sum("points").alias("total_points"),
+            pl.sum("price").alias("total_price"),
+            pl.mean("form").alias("avg_form"),
+        ])
+        .select(
+            "team",
+            "driver_count",
+            "total_points",
+            (pl.col("total_points") / pl.col("driver_count")).alias("avg_points_per_driver"),
+            "total_price",
+            "avg_form",
+        )
+    )
+    
+    # A partial top-k avoids sorting every team when only the best few are wanted;
+    # top_k leaves its rows unordered, so the k survivors are sorted afterwards
+    if top_n is not None:
+        performance_lf = performance_lf.top_k(top_n, by="total_points")
+    
+    return performance_lf.sort("total_points", descending=True)
+
+
+def analyze_team_performance(
+    drivers_df: pl.DataFrame, top_n: Optional[int] = None
+) -> pl.DataFrame:
     """Analyze team performance based on driver data.
     
     Args:
         drivers_df: Polars DataFrame with driver data
+        top_n: Only return this many teams with the most total points, if given
         
     Returns:
-        Polars DataFrame with team performance metrics
+        Polars DataFrame with team performance metrics, best teams first
     """
-    # Group by team and calculate aggregates
-    return drivers_df.group_by("team").agg(
-        pl.count("id").alias("driver_count"),
-        pl.sum("points").alias("total_points"),
-        pl.mean("points").alias("avg_points_per_driver"),
-        pl.sum("price").alias("total_price"),
-        pl.mean("form").alias("avg_form")
-    ).sort("total_points", descending=True)
+    # Run as one lazy plan, so only the aggregated columns are read
+    return _team_performance_plan(drivers_df.lazy(), top_n).collect()
+
+
+def _corr_slope_intercept(x: np.ndarray, y: np.ndarray) -> Tuple[float, float, float]:
+    """Compute the correlation and least-squares line of y against x.
+    
+    Args:
+        x: Independent values, at least two of them
+        y: Dependent values, the same length as x
+        
+    Returns:
+        Tuple containing (correlation, slope, intercept); the correlation is NaN and
+        the slope 0 when x or y is constant
+    """
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    sxx, syy, sxy = dx @ dx, dy @ dy, dx @ dy
+    
+    correlation = sxy / np.sqrt(sxx * syy) if sxx > 0 and syy > 0 else float("nan")
+    slope = sxy / sxx if sxx > 0 else 0.0
+    return float(correlation), float(slope), float(my - slope * mx)
 
 
 def analyze_price_to_points_correlation(drivers_df: pl.DataFrame) -> Dict[str, float]:
@@ -106,23 +208,19 @@ def analyze_price_to_points_correlation(drivers_df: pl.DataFrame) -> Dict[str, f
     Returns:
         Dictionary with correlation metrics
     """
-    # Calculate correlation between price and points
-    correlation = drivers_df.select(
-        pl.corr("price", "points").alias("price_points_corr")
-    ).item()
-    
-    # Calculate linear regression coefficients
-    if len(drivers_df) > 1:
-        X = drivers_df.select("price").to_numpy()
-        y = drivers_df.select("points").to_numpy()
-        slope, intercept = np.polyfit(X.flatten(), y.flatten(), 1)
-    else:
-        slope, intercept = 0.0, 0.0
+    # With only ~20 drivers, a few NumPy reductions on the raw columns are cheaper
+    # than dispatching a Polars query
+    if len(drivers_df) < 2:
+        return {"correlation": float("nan"), "slope": 0.0, "intercept": 0.0}
+    
+    x = drivers_df["price"].to_numpy().astype(np.float64)
+    y = drivers_df["points"].to_numpy().astype(np.float64)
+    correlation, slope, intercept = _corr_slope_intercept(x, y)
     
     return {
         "correlation": correlation,
-        "slope": float(slope),
-        "intercept": float(intercept)
+        "slope": slope,
+        "intercept": intercept
     }
 
 
@@ -130,24 +228,51 @@ def find_undervalued_drivers(drivers_df: pl.DataFrame, threshold: float = 0.1) -
     """Find undervalued drivers based on price-to-points ratio.
     
     Args:
-        drivers_df: Polars DataFrame with driver data
+        drivers_df: Polars DataFrame with driver data and value column
         threshold: Threshold for considering a driver undervalued
         
     Returns:
         Polars DataFrame with undervalued drivers
     """
-    # Calculate value (points per unit price)
-    drivers_with_value = drivers_df.with_columns(
-        (pl.col("points") / pl.col("price")).alias("value")
+    # Keep drivers with value above average + threshold in one lazy plan; the
+    # average is taken over all drivers before the filter applies
+    return (
+        drivers_df.lazy()
+        .filter(pl.col("value") > pl.col("value").mean() * (1 + threshold))
+        .sort("value", descending=True)
+        .collect()
     )
+
+
+def _future_points_plan(
+    drivers_lf: pl.LazyFrame,
+    races_completed: int,
+    races_remaining: int
+) -> pl.LazyFrame:
+    """Build the lazy query behind predict_future_points for a season already under way.
     
-    # Calculate average value
-    avg_value = drivers_with_value.select(pl.mean("value")).item()
-    
-    # Find drivers with value above average + threshold
-    return drivers_with_value.filter(
-        pl.col("value") > avg_value * (1 + threshold)
-    ).sort("value", descending=True)
+    Args:
+        drivers_lf: Polars LazyFrame with driver data
+        races_completed: Number of races completed, at least one
+        races_remaining: Number of races remaining
+        
+    Returns:
+        Polars LazyFrame with predicted points, highest predicted total first
+    """
+    # Points per race scaled by form (neutral when missing) over the remaining races,
+    # computed once and reused for the total
+    return (
+        drivers_lf
+        .with_columns(
+            (
+                pl.col("points") / races_completed * pl.col("form").fill_null(1.0) * races_remaining
+            ).alias("predicted_future_points")
+        )
+        .with_columns(
+            (pl.col("points") + pl.col("predicted_future_points")).alias("predicted_total_points")
+        )
+        .sort("predicted_total_points", descending=True)
+    )
 
 
 def predict_future_points(
@@ -171,21 +296,188 @@ def predict_future_points(
             pl.col("points").alias("predicted_total_points")
         )
     
-    # Calculate points per race
-    drivers_with_prediction = drivers_df.with_columns(
-        (pl.col("points") / races_completed).alias("points_per_race"),
-        # Apply form factor if available
-        pl.when(pl.col("form").is_not_null())
-          .then(pl.col("form"))
-          .otherwise(1.0)
-          .alias("form_factor")
+    return _future_points_plan(drivers_df.lazy(), races_completed, races_remaining).collect()
+
+
+def _greedy_selection_with_team_limit(
+    sorted_drivers: pl.DataFrame,
+    affordable_teams: pl.DataFrame,
+    budget: float,
+    max_drivers: int,
+    max_per_team: int
+) -> Tuple[List[int], Optional[int]]:
+    """Pick the best-value team, then drivers greedily by value within the team limit.
+    
+    The greedy drivers are replaced by the single highest-scoring affordable driver
+    when that one scores more on its own.
+    
+    Args:
+        sorted_drivers: Affordable drivers sorted by value, best first
+        affordable_teams: Affordable teams
+        budget: Total budget available
+        max_drivers: Maximum number of drivers to select
+        max_per_team: Maximum number of drivers from the same team
+        
+    Returns:
+        Tuple containing (driver row indices, team row index or None)
+    """
+    # Select best team first
+    team_index = None
+    remaining_budget = budget
+    if not affordable_teams.is_empty():
+        team_index = affordable_teams["value"].arg_max()
+        remaining_budget -= affordable_teams["price"][team_index]
+    
+    # Greedy selection with team constraints, reading plain column lists rather
+    # than building a dict per candidate row
+    prices = sorted_drivers["price"].to_list()
+    driver_teams = sorted_drivers["team"].to_list()
+    driver_budget = remaining_budget
+    chosen = []
+    team_counts = {}
+    
+    for i, (price, team_name) in enumerate(zip(prices, driver_teams, strict=True)):
+        if len(chosen) >= max_drivers:
+            break
+        
+        current_team_count = team_counts.get(team_name, 0)
+        
+        # Check team constraint
+        if current_team_count >= max_per_team:
+            continue
+        
+        # Check budget constraint
+        if price <= remaining_budget:
+            chosen.append(i)
+            remaining_budget -= price
+            team_counts[team_name] = current_team_count + 1
+    
+    # Greedy by value alone can end arbitrarily far from the best selection when a
+    # high-scoring driver no longer fits after the cheaper picks, so fall back to the
+    # best single driver when that scores more (the modified greedy rule)
+    points = sorted_drivers["points"].to_list()
+    if max_drivers >= 1 and max_per_team >= 1:
+        affordable = [i for i, price in enumerate(prices) if price <= driver_budget]
+        if affordable:
+            best = max(affordable, key=points.__getitem__)
+            if points[best] > sum(points[i] for i in chosen):
+                chosen = [best]
+    
+    return chosen, team_index
+
+
+def _knapsack_selection_with_team_limit(
+    sorted_drivers: pl.DataFrame,
+    affordable_teams: pl.DataFrame,
+    budget: float,
+    max_drivers: int,
+    max_per_team: int
+) -> Optional[Tuple[List[int], Optional[int]]]:
+    """Find the points-maximising team and drivers exactly with a grouped knapsack.
+    
+    Drivers are grouped by team and each group offers every way of picking up to
+    ``max_per_team`` of its drivers, of which at most one is taken. ``dp[k, c]``
+    holds the best points from exactly ``k`` drivers costing at most ``c`` (prices
+    scaled to integers by their decimal places), and the best constructor is then
+    chosen against the capacity it leaves, as in ``performance.optimal_team_selection``.
+    
+    Args:
+        sorted_drivers: Affordable drivers
+        affordable_teams: Affordable teams
+        budget: Total budget available
+        max_drivers: Maximum number of drivers to select
+        max_per_team: Maximum number of drivers from the same team
+        
+    Returns:
+        Tuple containing (driver row indices, team row index or None), or None when
+        the table would exceed MAX_DP_CELLS
+    """
+    prices = sorted_drivers["price"].to_numpy()
+    team_prices = affordable_teams["price"].to_numpy()
+    scale = price_scale(prices, team_prices)
+    capacity = int(np.floor(budget * scale + 1e-9))
+    costs = scale_prices(prices, scale)
+    points = sorted_drivers["points"].to_numpy().astype(np.float64)
+    
+    # Only constructors whose scaled cost fits can be picked; team_rows maps back
+    # to rows of affordable_teams
+    team_costs = scale_prices(team_prices, scale)
+    team_rows = np.flatnonzero(team_costs <= capacity)
+    team_costs = team_costs[team_rows]
+    team_points = affordable_teams["points"].to_numpy().astype(np.float64)[team_rows]
+    
+    # Whenever a constructor is affordable one is always picked, so the drivers can
+    # never use more than what is left after the cheapest one
+    driver_capacity = capacity - int(team_costs.min()) if len(team_costs) else capacity
+    
+    groups: Dict[Optional[str], List[int]] = {}
+    for i, team_name in enumerate(sorted_drivers["team"].to_list()):
+        groups.setdefault(team_name, []).append(i)
+    
+    # Bound the table size by counting the options before enumerating any; one
+    # large team would otherwise generate a combinatorial number of them
+    max_group_size = min(max_per_team, max_drivers)
+    option_bound = sum(
+        math.comb(len(members), size)
+        for members in groups.values()
+        for size in range(1, min(max_group_size, len(members)) + 1)
     )
+    if max(option_bound, 1) * (max_drivers + 1) * (driver_capacity + 1) > MAX_DP_CELLS:
+        return None
+    
+    # Every affordable way to pick drivers from each team, as (indices, cost, points)
+    group_options = []
+    for members in groups.values():
+        options = []
+        for size in range(1, min(max_group_size, len(members)) + 1):
+            for combo in combinations(members, size):
+                cost = int(costs[list(combo)].sum())
+                if cost <= driver_capacity:
+                    options.append((combo, cost, float(points[list(combo)].sum())))
+        if options:
+            group_options.append(options)
+    
+    # dp[k, c]: best points using exactly k drivers with total cost <= c
+    dp = np.full((max_drivers + 1, driver_capacity + 1), -np.inf)
+    dp[0, :] = 0.0
+    choice = np.zeros((len(group_options), max_drivers + 1, driver_capacity + 1), dtype=np.int32)
+    
+    for g, options in enumerate(group_options):
+        # Options of one team all extend the table from before that team, so at
+        # most one of them is ever taken
+        previous = dp.copy()
+        for o, (combo, w, gain) in enumerate(options, start=1):
+            size = len(combo)
+            candidate = previous[:-size, : driver_capacity + 1 - w] + gain
+            improved = candidate > dp[size:, w:]
+            dp[size:, w:] = np.where(improved, candidate, dp[size:, w:])
+            choice[g, size:, w:][improved] = o
     
-    # Predict future points
-    return drivers_with_prediction.with_columns(
-        (pl.col("points_per_race") * pl.col("form_factor") * races_remaining).alias("predicted_future_points"),
-        (pl.col("points") + pl.col("points_per_race") * pl.col("form_factor") * races_remaining).alias("predicted_total_points")
-    ).sort("predicted_total_points", descending=True)
+    # Pick the constructor that leaves the most valuable driver line-up
+    team_index = None
+    best_k, best_c = int(np.argmax(dp[:, driver_capacity])), driver_capacity
+    if len(team_costs):
+        remaining = capacity - team_costs
+        totals = team_points + dp[:, remaining].max(axis=0)
+        best = int(np.argmax(totals))
+        team_index = int(team_rows[best])
+        best_c = int(remaining[best])
+        best_k = int(np.argmax(dp[:, best_c]))
+    
+    # Walk the choice table backwards to recover the chosen drivers
+    chosen = []
+    k, c = best_k, best_c
+    for g in range(len(group_options) - 1, -1, -1):
+        if k == 0:
+            break
+        o = choice[g, k, c]
+        if o:
+            combo, w, _ = group_options[g][o - 1]
+            chosen.extend(combo)
+            k -= len(combo)
+            c -= w
+    
+    return sorted(chosen), team_index
 
 
 def optimize_team_selection_advanced(
@@ -197,9 +489,12 @@ def optimize_team_selection_advanced(
 ) -> Tuple[pl.DataFrame, Optional[Dict], float]:
     """Advanced team selection optimization with team constraints.
     
+    The selection maximises total points exactly with a grouped knapsack; problems
+    too large for the table fall back to greedy selection by value.
+    
     Args:
-        drivers_df: Polars DataFrame with driver data
-        teams_df: Polars DataFrame with team data
+        drivers_df: Polars DataFrame with driver data and value column
+        teams_df: Polars DataFrame with team data and value column
         budget: Total budget available
         max_drivers: Maximum number of drivers to select
         max_per_team: Maximum number of drivers from the same team
@@ -207,52 +502,42 @@ def optimize_team_selection_advanced(
     Returns:
         Tuple containing (selected_drivers_df, selected_team, remaining_budget)
     """
-    # Add value column
-    drivers_with_value = drivers_df.with_columns(
-        (pl.col("points") / pl.col("price")).alias("value")
+    # Drop anything unaffordable and sort drivers by value in one lazy plan per
+    # frame; filtering before sorting keeps the sort input small
+    drivers_lf = (
+        drivers_df.lazy()
+        .filter(pl.col("price") <= budget)
+        .sort("value", descending=True)
     )
     
-    teams_with_value = teams_df.with_columns(
-        (pl.col("points") / pl.col("price")).alias("value")
+    teams_lf = (
+        teams_df.lazy()
+        .filter(pl.col("price") <= budget)
     )
     
-    # Sort by value
-    sorted_drivers = drivers_with_value.sort("value", descending=True)
-    sorted_teams = teams_with_value.sort("value", descending=True)
+    # Materialize both plans together so Polars can run them in parallel
+    sorted_drivers, affordable_teams = pl.collect_all([drivers_lf, teams_lf])
     
-    # Select best team first
-    selected_team = None
-    if not sorted_teams.is_empty():
-        selected_team = sorted_teams.row(0, named=True)
-        remaining_budget = budget - selected_team["price"]
-    else:
-        remaining_budget = budget
-    
-    # Greedy selection with team constraints
-    selected_drivers = []
-    team_counts = {}
+    selection = None
+    if budget >= 0 and max_drivers >= 0 and max_per_team >= 0:
+        selection = _knapsack_selection_with_team_limit(
+            sorted_drivers, affordable_teams, budget, max_drivers, max_per_team
+        )
+    if selection is None:
+        logger.debug("Knapsack table too large, using greedy team selection")
+        selection = _greedy_selection_with_team_limit(
+            sorted_drivers, affordable_teams, budget, max_drivers, max_per_team
+        )
+    chosen, team_index = selection
     
-    for row in sorted_drivers.iter_rows(named=True):
-        if len(selected_drivers) >= max_drivers:
-            break
-        
-        team_name = row["team"]
-        current_team_count = team_counts.get(team_name, 0)
-        
-        # Check team constraint
-        if current_team_count >= max_per_team:
-            continue
-        
-        # Check budget constraint
-        if row["price"] <= remaining_budget:
-            selected_drivers.append(row)
-            remaining_budget -= row["price"]
-            team_counts[team_name] = current_team_count + 1
+    selected_team = None
+    remaining_budget = budget
+    if team_index is not None:
+        selected_team = affordable_teams.row(team_index, named=True)
+        remaining_budget -= selected_team["price"]
     
-    # Convert selected drivers to DataFrame
-    if selected_drivers:
-        selected_drivers_df = pl.DataFrame(selected_drivers)
-    else:
-        selected_drivers_df = pl.DataFrame(schema=sorted_drivers.schema)
+    # Take the chosen rows in one gather; an empty selection keeps the schema
+    selected_drivers_df = sorted_drivers[chosen]
+    remaining_budget -= sum(selected_drivers_df["price"].to_list())
     
-    return selected_drivers_df, selected_team, remaining_budget 
\ No newline at end of file
+    return selected_drivers_df, selected_team, remaining_budget
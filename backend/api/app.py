@@ -1,23 +1,40 @@
 """Main FastAPI application for F1 Fantasy Analysis."""
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.api.routes import close_data_fetcher, open_data_fetcher
 from backend.api.routes import router as api_router
+from backend.utils.config import CORS_MAX_AGE, CORS_ORIGINS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one data fetcher across requests for the lifetime of the application."""
+    await open_data_fetcher()
+    try:
+        yield
+    finally:
+        await close_data_fetcher()
+
 
 app = FastAPI(
     title="F1 Fantasy Analysis API",
     description="API for analyzing F1 Fantasy data",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Configure CORS
+# Configure CORS (the API is read-only, so only GET needs to be allowed)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=CORS_ORIGINS,  # In production, set CORS_ORIGINS to specific origins
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=CORS_MAX_AGE,
 )
 
 # Include API routes
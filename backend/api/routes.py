@@ -1,8 +1,10 @@
 """API routes for F1 Fantasy Analysis."""
 
-from typing import Dict, List
+import asyncio
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import polars as pl
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from backend.analysis.performance import (
     analyze_form_trends,
@@ -20,18 +22,89 @@ from backend.analysis.polars_analysis import (
     predict_future_points,
 )
 from backend.data.fetcher import F1DataFetcher
-from backend.data.models import Driver, Race, Team
+from backend.data.models import Driver, DriverValue, OptimalTeam, Race, Team, TeamValue
+from backend.utils.cache import cached_response, cached_value
 from backend.utils.config import DEFAULT_BUDGET, MAX_DRIVERS
 
 router = APIRouter(prefix="/api/v1", tags=["F1 Fantasy"])
 
+# Data fetcher shared across requests while the application is running
+_shared_fetcher: Optional[F1DataFetcher] = None
+
+
+def dataframe_response(df: pl.DataFrame) -> Response:
+    """Serialize a DataFrame straight to a JSON array of row objects.
+
+    Polars writes the JSON from its column buffers, which skips building a Python
+    dict per row and FastAPI's own response serialization.
+
+    Args:
+        df: DataFrame to return
+
+    Returns:
+        JSON response with one object per row
+    """
+    return Response(content=df.write_json(), media_type="application/json")
+
+
+def get_driver_dataframe(drivers: List[Driver]) -> pl.DataFrame:
+    """Get the drivers DataFrame, reusing a cached one built from identical driver data.
+
+    Args:
+        drivers: List of Driver objects
+
+    Returns:
+        Polars DataFrame with driver data, without race history
+    """
+    key = ("drivers_df", tuple((d.id, d.name, d.team, d.price, d.points, d.form) for d in drivers))
+    return cached_value(key, lambda: create_driver_dataframe(drivers))
+
+
+def get_team_dataframe(teams: List[Team]) -> pl.DataFrame:
+    """Get the teams DataFrame, reusing a cached one built from identical team data.
+
+    Args:
+        teams: List of Team objects
+
+    Returns:
+        Polars DataFrame with team data, without race history
+    """
+    key = (
+        "teams_df",
+        tuple((t.id, t.name, t.price, t.points, t.form) for t in teams),
+    )
+    return cached_value(key, lambda: create_team_dataframe(teams))
+
+
+async def open_data_fetcher() -> None:
+    """Create the data fetcher shared by all requests (called at application startup)."""
+    global _shared_fetcher
+    if _shared_fetcher is None:
+        _shared_fetcher = F1DataFetcher()
+
+
+async def close_data_fetcher() -> None:
+    """Close the shared data fetcher (called at application shutdown)."""
+    global _shared_fetcher
+    if _shared_fetcher is not None:
+        await _shared_fetcher.close()
+        _shared_fetcher = None
+
 
 async def get_data_fetcher() -> F1DataFetcher:
     """Dependency to get a data fetcher instance.
 
+    The shared fetcher, with its connection pool and cached upstream data, is used
+    when the application has started one; otherwise a fetcher is created for the
+    request and closed afterwards.
+
     Returns:
         F1DataFetcher instance
     """
+    if _shared_fetcher is not None:
+        yield _shared_fetcher
+        return
+
     fetcher = F1DataFetcher()
     try:
         yield fetcher
@@ -87,7 +160,8 @@ async def get_teams(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     return teams
 
 
-@router.get("/analysis/driver-value", response_model=List[Dict])
+@router.get("/analysis/driver-value", response_model=List[DriverValue])
+@cached_response()
 async def get_driver_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     """Get driver value analysis (points per million).
 
@@ -95,7 +169,7 @@ async def get_driver_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fe
         fetcher: F1DataFetcher instance
 
     Returns:
-        List of dictionaries containing driver value analysis
+        List of DriverValue objects sorted by value efficiency
     """
     drivers = await fetcher.get_drivers()
     if not drivers:
@@ -103,15 +177,13 @@ async def get_driver_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fe
     
     ranked_drivers = rank_drivers_by_value(drivers)
     return [
-        {
-            "driver": driver.dict(),
-            "value_efficiency": value_efficiency,
-        }
+        DriverValue(driver=driver, value_efficiency=value_efficiency)
         for driver, value_efficiency in ranked_drivers
     ]
 
 
-@router.get("/analysis/team-value", response_model=List[Dict])
+@router.get("/analysis/team-value", response_model=List[TeamValue])
+@cached_response()
 async def get_team_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     """Get team value analysis (points per million).
 
@@ -119,7 +191,7 @@ async def get_team_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fetc
         fetcher: F1DataFetcher instance
 
     Returns:
-        List of dictionaries containing team value analysis
+        List of TeamValue objects sorted by value efficiency
     """
     teams = await fetcher.get_teams()
     if not teams:
@@ -127,15 +199,13 @@ async def get_team_value_analysis(fetcher: F1DataFetcher = Depends(get_data_fetc
     
     ranked_teams = rank_teams_by_value(teams)
     return [
-        {
-            "team": team.dict(),
-            "value_efficiency": value_efficiency,
-        }
+        TeamValue(team=team, value_efficiency=value_efficiency)
         for team, value_efficiency in ranked_teams
     ]
 
 
 @router.get("/analysis/form-trends", response_model=Dict[str, float])
+@cached_response()
 async def get_form_trends(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     """Get driver form trends.
 
@@ -152,13 +222,14 @@ async def get_form_trends(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     return analyze_form_trends(drivers)
 
 
-@router.get("/analysis/optimal-team", response_model=Dict)
+@router.get("/analysis/optimal-team", response_model=OptimalTeam)
+@cached_response()
 async def get_optimal_team(
     budget: float = DEFAULT_BUDGET,
     max_drivers: int = MAX_DRIVERS,
     fetcher: F1DataFetcher = Depends(get_data_fetcher),
 ):
-    """Get the optimal team selection based on value efficiency.
+    """Get the team selection that maximises total points within the budget.
 
     Args:
         budget: Total budget available
@@ -166,10 +237,10 @@ async def get_optimal_team(
         fetcher: F1DataFetcher instance
 
     Returns:
-        Dictionary containing the optimal team selection
+        OptimalTeam object describing the selection
     """
-    drivers = await fetcher.get_drivers()
-    teams = await fetcher.get_teams()
+    # The two upstream requests are independent, so run them concurrently
+    drivers, teams = await asyncio.gather(fetcher.get_drivers(), fetcher.get_teams())
     
     if not drivers or not teams:
         raise HTTPException(status_code=404, detail="No drivers or teams found")
@@ -178,37 +249,43 @@ async def get_optimal_team(
         drivers, teams, budget, max_drivers
     )
     
-    return {
-        "drivers": [driver.dict() for driver in selected_drivers],
-        "team": selected_team.dict() if selected_team else None,
-        "total_cost": budget - remaining_budget,
-        "remaining_budget": remaining_budget,
-    }
+    return OptimalTeam(
+        drivers=selected_drivers,
+        team=selected_team,
+        total_cost=budget - remaining_budget,
+        remaining_budget=remaining_budget,
+    )
 
 
 # New endpoints using Polars analysis
 
-@router.get("/analysis/team-performance", response_model=List[Dict])
-async def get_team_performance(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
+@router.get("/analysis/team-performance", response_class=Response)
+@cached_response()
+async def get_team_performance(
+    limit: Optional[int] = Query(None, ge=1, description="Only return this many top teams"),
+    fetcher: F1DataFetcher = Depends(get_data_fetcher)
+):
     """Get team performance analysis.
 
     Args:
+        limit: Only return this many teams with the most total points, if given
         fetcher: F1DataFetcher instance
 
     Returns:
-        List of dictionaries containing team performance metrics
+        JSON response listing team performance metrics
     """
     drivers = await fetcher.get_drivers()
     if not drivers:
         raise HTTPException(status_code=404, detail="No drivers found")
     
-    drivers_df = create_driver_dataframe(drivers)
-    performance_df = analyze_team_performance(drivers_df)
+    drivers_df = get_driver_dataframe(drivers)
+    performance_df = analyze_team_performance(drivers_df, top_n=limit)
     
-    return performance_df.to_dicts()
+    return dataframe_response(performance_df)
 
 
 @router.get("/analysis/price-points-correlation", response_model=Dict)
+@cached_response()
 async def get_price_points_correlation(fetcher: F1DataFetcher = Depends(get_data_fetcher)):
     """Get correlation analysis between price and points.
 
@@ -222,11 +299,12 @@ async def get_price_points_correlation(fetcher: F1DataFetcher = Depends(get_data
     if not drivers:
         raise HTTPException(status_code=404, detail="No drivers found")
     
-    drivers_df = create_driver_dataframe(drivers)
+    drivers_df = get_driver_dataframe(drivers)
     return analyze_price_to_points_correlation(drivers_df)
 
 
-@router.get("/analysis/undervalued-drivers", response_model=List[Dict])
+@router.get("/analysis/undervalued-drivers", response_class=Response)
+@cached_response()
 async def get_undervalued_drivers(
     threshold: float = Query(0.1, description="Threshold for considering a driver undervalued"),
     fetcher: F1DataFetcher = Depends(get_data_fetcher)
@@ -238,19 +316,20 @@ async def get_undervalued_drivers(
         fetcher: F1DataFetcher instance
 
     Returns:
-        List of dictionaries containing undervalued drivers
+        JSON response listing undervalued drivers
     """
     drivers = await fetcher.get_drivers()
     if not drivers:
         raise HTTPException(status_code=404, detail="No drivers found")
     
-    drivers_df = create_driver_dataframe(drivers)
+    drivers_df = get_driver_dataframe(drivers)
     undervalued_df = find_undervalued_drivers(drivers_df, threshold)
     
-    return undervalued_df.to_dicts()
+    return dataframe_response(undervalued_df)
 
 
-@router.get("/analysis/predict-points", response_model=List[Dict])
+@router.get("/analysis/predict-points", response_class=Response)
+@cached_response()
 async def get_predicted_points(
     races_completed: int = Query(..., description="Number of races completed"),
     races_remaining: int = Query(..., description="Number of races remaining"),
@@ -264,19 +343,20 @@ async def get_predicted_points(
         fetcher: F1DataFetcher instance
 
     Returns:
-        List of dictionaries containing predicted points
+        JSON response listing predicted points
     """
     drivers = await fetcher.get_drivers()
     if not drivers:
         raise HTTPException(status_code=404, detail="No drivers found")
     
-    drivers_df = create_driver_dataframe(drivers)
+    drivers_df = get_driver_dataframe(drivers)
     prediction_df = predict_future_points(drivers_df, races_completed, races_remaining)
     
-    return prediction_df.to_dicts()
+    return dataframe_response(prediction_df)
 
 
 @router.get("/analysis/optimal-team-advanced", response_model=Dict)
+@cached_response()
 async def get_optimal_team_advanced(
     budget: float = DEFAULT_BUDGET,
     max_drivers: int = MAX_DRIVERS,
@@ -294,14 +374,14 @@ async def get_optimal_team_advanced(
     Returns:
         Dictionary containing the optimal team selection
     """
-    drivers = await fetcher.get_drivers()
-    teams = await fetcher.get_teams()
+    # The two upstream requests are independent, so run them concurrently
+    drivers, teams = await asyncio.gather(fetcher.get_drivers(), fetcher.get_teams())
     
     if not drivers or not teams:
         raise HTTPException(status_code=404, detail="No drivers or teams found")
     
-    drivers_df = create_driver_dataframe(drivers)
-    teams_df = create_team_dataframe(teams)
+    drivers_df = get_driver_dataframe(drivers)
+    teams_df = get_team_dataframe(teams)
     
     selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
         drivers_df, teams_df, budget, max_drivers, max_per_team
@@ -2,8 +2,6 @@
 
 import uvicorn
 
-from backend.api.app import app
-
 if __name__ == "__main__":
     uvicorn.run(
         "backend.api.app:app",
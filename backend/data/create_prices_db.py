@@ -3,11 +3,18 @@
 Script to create database tables for F1 Fantasy driver and constructor prices.
 """
 
-import sqlite3
-import os
 import json
+import logging
+import os
 import pathlib
+import re
+import sqlite3
 from datetime import datetime
+from itertools import batched
+
+from backend.utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
 
 # Get the project root directory
 ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
@@ -19,12 +26,78 @@ os.makedirs(DATA_DIR, exist_ok=True)
 # Database file path
 DB_FILE = os.path.join(DATA_DIR, 'f1_fantasy.db')
 
-def create_database():
-    """Create the SQLite database and tables for F1 Fantasy prices."""
-    print("Creating F1 Fantasy prices database tables...")
+# Statements used by the bulk load, kept as constants so each one is prepared
+# once and then served from the connection's statement cache
+INSERT_TEAM_SQL = 'INSERT OR IGNORE INTO teams (name) VALUES (?)'
+INSERT_TEAM_RETURNING_SQL = 'INSERT INTO teams (name) VALUES (?) RETURNING id'
+SELECT_TEAM_IDS_SQL = 'SELECT name, id FROM teams'
+INSERT_TEAM_PRICE_SQL = 'INSERT INTO team_prices (team_id, price, effective_date) VALUES (?, ?, ?)'
+INSERT_DRIVER_SQL = 'INSERT OR IGNORE INTO drivers (name, team_id) VALUES (?, ?)'
+INSERT_DRIVER_PRICE_SQL = (
+    'INSERT INTO driver_prices (driver_id, price, effective_date) VALUES (?, ?, ?)'
+)
+
+# Number of rows handed to each executemany call while loading
+BATCH_SIZE = 1000
+
+# ISO 8601 timestamps as written by the scrapers, e.g. 2025-03-14T18:08:18.709602
+ISO_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?')
+
+# Whitespace and the comma separating items of a JSON array
+JSON_SEPARATOR_RE = re.compile(r'\s*,?\s*')
+
+def to_db_timestamp(value):
+    """Convert an ISO 8601 timestamp string to the text format SQLite stores.
+    
+    Well-formed strings only have their date/time separator swapped, avoiding a
+    datetime round-trip per row; anything else is parsed and re-serialized.
+    """
+    if ISO_TIMESTAMP_RE.fullmatch(value):
+        return value.replace('T', ' ', 1)
+    return datetime.fromisoformat(value).isoformat(' ')
+
+def iter_json_array(path, chunk_size=64 * 1024):
+    """Yield the items of a top-level JSON array without loading the whole file.
+    
+    Args:
+        path: Path to a JSON file containing an array of objects
+        chunk_size: Number of characters to read from the file at a time
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"Expected a JSON array in {path}")
+        # Decode in place from an offset; the buffer is only rebuilt when it runs out
+        pos = 1
+        
+        while True:
+            pos = JSON_SEPARATOR_RE.match(buffer, pos).end()
+            if buffer.startswith(']', pos):
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The next item spans the chunk boundary, so read more of the file
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield item
+
+def create_database(conn=None):
+    """Create the SQLite database and tables for F1 Fantasy prices.
+    
+    Args:
+        conn: Existing connection to create the tables on (opens DB_FILE if None)
+    """
+    logger.info("Creating F1 Fantasy prices database tables...")
     
     # Connect to the database (creates it if it doesn't exist)
-    conn = sqlite3.connect(DB_FILE)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
     
     # Create tables
@@ -86,92 +159,148 @@ def create_database():
     )
     ''')
     
+    # Indexes for the latest-price lookups and team joins
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_driver_prices_did_date
+    ON driver_prices (driver_id, effective_date DESC)
+    ''')
+    
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_team_prices_tid_date
+    ON team_prices (team_id, effective_date DESC)
+    ''')
+    
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_drivers_team ON drivers (team_id)')
+    
+    # Views of the most recent price per driver and per team, for ad-hoc queries;
+    # Prices runs the same window query inline so it works without them
+    for table, id_column in (('driver_prices', 'driver_id'), ('team_prices', 'team_id')):
+        cursor.execute(f'''
+        CREATE VIEW IF NOT EXISTS latest_{table} AS
+        SELECT {id_column}, price, effective_date
+        FROM (
+            SELECT {id_column}, price, effective_date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {id_column} ORDER BY effective_date DESC
+                   ) AS rn
+            FROM {table}
+        )
+        WHERE rn = 1
+        ''')
+    
     # Commit the changes
     conn.commit()
     
-    print("Database tables created successfully.")
+    logger.info("Database tables created successfully.")
     return conn
 
 def populate_database():
     """Populate the database with driver and constructor prices."""
-    print("Populating database with driver and constructor prices...")
+    logger.info("Populating database with driver and constructor prices...")
     
+    conn = None
     try:
-        # Read the JSON files
         drivers_json_path = os.path.join(DATA_DIR, 'f1_fantasy_drivers.json')
         constructors_json_path = os.path.join(DATA_DIR, 'f1_fantasy_constructors.json')
         
-        with open(drivers_json_path, "r", encoding="utf-8") as f:
-            drivers_data = json.load(f)
-        
-        with open(constructors_json_path, "r", encoding="utf-8") as f:
-            constructors_data = json.load(f)
-        
-        # Connect to the database
-        conn = create_database()
+        # One connection (and its statement cache) serves the whole load
+        conn = sqlite3.connect(DB_FILE)
         cursor = conn.cursor()
         
-        # Insert teams (constructors)
-        for constructor in constructors_data:
-            # Insert team
-            cursor.execute(
-                'INSERT OR IGNORE INTO teams (name) VALUES (?)',
-                (constructor["name"],)
+        # Bulk-load settings: the whole load is one transaction, so a crash
+        # simply rolls back and a full fsync per statement is unnecessary. WAL and
+        # exclusive locking only last for the load and are undone below
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA cache_size=-65536')
+        cursor.execute('PRAGMA locking_mode=EXCLUSIVE')
+        create_database(conn)
+        # Take the write lock up front so the load can't fail with SQLITE_BUSY
+        # part-way through when another connection is reading
+        cursor.execute('BEGIN IMMEDIATE')
+        
+        # The JSON files are streamed and loaded in batches so memory stays bounded
+        # by BATCH_SIZE rather than by the length of the price history. Start from
+        # the teams already stored, so drivers whose team is missing from this
+        # run's constructors file still resolve to it
+        team_ids = dict(cursor.execute(SELECT_TEAM_IDS_SQL).fetchall())
+        constructor_batches = batched(
+            iter_json_array(constructors_json_path), BATCH_SIZE, strict=False
+        )
+        for constructors in constructor_batches:
+            # Insert teams (constructors)
+            cursor.executemany(
+                INSERT_TEAM_SQL, [(constructor["name"],) for constructor in constructors]
             )
+            team_ids.update(cursor.execute(SELECT_TEAM_IDS_SQL).fetchall())
             
-            # Get team ID
-            cursor.execute('SELECT id FROM teams WHERE name = ?', (constructor["name"],))
-            team_id = cursor.fetchone()[0]
-            
-            # Insert team price
-            effective_date = datetime.fromisoformat(constructor["scrape_date"])
-            cursor.execute(
-                'INSERT INTO team_prices (team_id, price, effective_date) VALUES (?, ?, ?)',
-                (team_id, constructor["price"], effective_date)
+            # Insert team prices
+            cursor.executemany(
+                INSERT_TEAM_PRICE_SQL,
+                [
+                    (
+                        team_ids[constructor["name"]],
+                        constructor["price"],
+                        to_db_timestamp(constructor["scrape_date"])
+                    )
+                    for constructor in constructors
+                ]
             )
         
-        # Insert drivers
-        for driver in drivers_data:
-            # Get team ID
-            cursor.execute('SELECT id FROM teams WHERE name = ?', (driver["team"],))
-            team_id_result = cursor.fetchone()
-            
-            if team_id_result is None:
-                # If team doesn't exist, insert it
-                cursor.execute(
-                    'INSERT INTO teams (name) VALUES (?)',
-                    (driver["team"],)
-                )
-                cursor.execute('SELECT id FROM teams WHERE name = ?', (driver["team"],))
-                team_id_result = cursor.fetchone()
-            
-            team_id = team_id_result[0]
-            
-            # Insert driver
-            cursor.execute(
-                'INSERT OR IGNORE INTO drivers (name, team_id) VALUES (?, ?)',
-                (driver["name"], team_id)
+        for drivers in batched(iter_json_array(drivers_json_path), BATCH_SIZE, strict=False):
+            # Insert any teams only referenced by drivers, taking their IDs straight
+            # from RETURNING rather than re-reading the teams table
+            missing_teams = dict.fromkeys(
+                driver["team"] for driver in drivers if driver["team"] not in team_ids
             )
+            for team_name in missing_teams:
+                cursor.execute(INSERT_TEAM_RETURNING_SQL, (team_name,))
+                team_ids[team_name] = cursor.fetchone()[0]
             
-            # Get driver ID
-            cursor.execute('SELECT id FROM drivers WHERE name = ?', (driver["name"],))
-            driver_id = cursor.fetchone()[0]
+            # Insert drivers
+            cursor.executemany(
+                INSERT_DRIVER_SQL,
+                [(driver["name"], team_ids[driver["team"]]) for driver in drivers]
+            )
+            names = list(dict.fromkeys(driver["name"] for driver in drivers))
+            driver_ids = dict(cursor.execute(
+                f'SELECT name, id FROM drivers WHERE name IN ({", ".join("?" * len(names))})',
+                names
+            ).fetchall())
             
-            # Insert driver price
-            effective_date = datetime.fromisoformat(driver["scrape_date"])
-            cursor.execute(
-                'INSERT INTO driver_prices (driver_id, price, effective_date) VALUES (?, ?, ?)',
-                (driver_id, driver["price"], effective_date)
+            # Insert driver prices
+            cursor.executemany(
+                INSERT_DRIVER_PRICE_SQL,
+                [
+                    (
+                        driver_ids[driver["name"]],
+                        driver["price"],
+                        to_db_timestamp(driver["scrape_date"])
+                    )
+                    for driver in drivers
+                ]
             )
         
         # Commit the changes
         conn.commit()
         
-        print("Database populated with driver and constructor prices.")
-        conn.close()
+        # Refresh planner statistics so the price indexes are used
+        cursor.execute('ANALYZE')
+        
+        logger.info("Database populated with driver and constructor prices.")
         
     except Exception as e:
-        print(f"Error populating database: {e}")
+        logger.error(f"Error populating database: {e}")
+    finally:
+        if conn is not None:
+            # Hand the file back in the default rollback-journal and locking modes,
+            # so other readers aren't left locked out or needing the WAL files
+            conn.rollback()
+            conn.execute('PRAGMA locking_mode=NORMAL')
+            conn.execute('PRAGMA journal_mode=DELETE')
+            conn.close()
 
 if __name__ == "__main__":
+    setup_logging()
     populate_database() 
\ No newline at end of file
@@ -1,35 +1,134 @@
 """Data fetcher module for retrieving F1 data from external sources."""
 
-import json
+import importlib.util
 import logging
-from typing import Dict, List, Optional, Union
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import httpx
 from pydantic import ValidationError
 
 from backend.data.models import Driver, Race, Team
+from backend.utils.config import CACHE_ENABLED, CACHE_TTL
+
+# Model type held by a cache entry
+ModelT = TypeVar("ModelT", Driver, Race, Team)
+
+# Parse upstream JSON with orjson when it is installed, falling back to the stdlib
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 logger = logging.getLogger(__name__)
 
+# Negotiate HTTP/2 when the optional h2 package is installed
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Keep-alive pool for the client, which is shared across requests while the app runs
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+
+
+def _mock_price(units: int, decimals: int) -> float:
+    """Build the mock price written as ``f"{units}.{decimals}"`` without parsing a string.
+
+    Args:
+        units: Whole millions
+        decimals: Digits after the decimal point, as an integer
+
+    Returns:
+        The price as a float
+    """
+    digits = 1
+    while decimals >= 10**digits:
+        digits += 1
+    return round(units + decimals / 10**digits, digits)
+
 
 class F1DataFetcher:
     """Class for fetching F1 data from external sources."""
 
-    def __init__(self, base_url: str = "https://ergast.com/api/f1"):
+    def __init__(
+        self,
+        base_url: str = "https://ergast.com/api/f1",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """Initialize the F1DataFetcher.
 
         Args:
             base_url: Base URL for the Ergast F1 API
+            transport: Optional transport for the HTTP client, e.g. a mock in tests
         """
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            timeout=30.0, http2=HTTP2_ENABLED, limits=HTTP_LIMITS, transport=transport
+        )
+
+        # Upstream results keyed by method name, with their expiry times
+        self._cache: Dict[str, Tuple[float, list]] = {}
 
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
 
+    def clear_cache(self) -> None:
+        """Discard cached upstream results so the next call fetches them again."""
+        self._cache.clear()
+
+    async def _cached(
+        self, key: str, loader: Callable[[], Awaitable[List[ModelT]]]
+    ) -> List[ModelT]:
+        """Return a cached upstream result, loading and caching it if missing or expired.
+
+        Empty results are not cached, since the loaders return an empty list when the
+        upstream request fails.
+
+        Args:
+            key: Cache key for the result
+            loader: Coroutine function fetching the result from upstream
+
+        Returns:
+            Copies of the cached or newly loaded models, so callers can modify them
+        """
+        if not CACHE_ENABLED:
+            return await loader()
+
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            return [item.model_copy(deep=True) for item in entry[1]]
+
+        result = await loader()
+        if result:
+            self._cache[key] = (now + CACHE_TTL, result)
+        return [item.model_copy(deep=True) for item in result]
+
     async def get_current_season_races(self) -> List[Race]:
-        """Get the current season's race schedule.
+        """Get the current season's race schedule, cached for CACHE_TTL seconds.
+
+        Returns:
+            List of Race objects
+        """
+        return await self._cached("races", self._load_current_season_races)
+
+    async def get_drivers(self) -> List[Driver]:
+        """Get the current drivers with mock fantasy data, cached for CACHE_TTL seconds.
+
+        Returns:
+            List of Driver objects with mock fantasy data
+        """
+        return await self._cached("drivers", self._load_drivers)
+
+    async def get_teams(self) -> List[Team]:
+        """Get the current teams with mock fantasy data, cached for CACHE_TTL seconds.
+
+        Returns:
+            List of Team objects with mock fantasy data
+        """
+        return await self._cached("teams", self._load_teams)
+
+    async def _load_current_season_races(self) -> List[Race]:
+        """Fetch the current season's race schedule from the API.
 
         Returns:
             List of Race objects
@@ -38,7 +137,7 @@ class F1DataFetcher:
         try:
             response = await self.client.get(url)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             races = []
             for race_data in data["MRData"]["RaceTable"]["Races"]:
@@ -59,8 +158,8 @@ class F1DataFetcher:
     # Note: The Ergast API doesn't provide fantasy pricing data
     # In a real application, you would need to fetch this from the official F1 Fantasy API
     # This is a placeholder implementation
-    async def get_drivers(self) -> List[Driver]:
-        """Get the current drivers with mock fantasy data.
+    async def _load_drivers(self) -> List[Driver]:
+        """Fetch the current drivers from the API and add mock fantasy data.
 
         Returns:
             List of Driver objects with mock fantasy data
@@ -69,7 +168,7 @@ class F1DataFetcher:
         try:
             response = await self.client.get(url)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             drivers = []
             for idx, driver_data in enumerate(data["MRData"]["DriverTable"]["Drivers"]):
@@ -78,9 +177,10 @@ class F1DataFetcher:
                     id=idx + 1,
                     name=f"{driver_data['givenName']} {driver_data['familyName']}",
                     team="Unknown",  # The Ergast API doesn't include team info in this endpoint
-                    price=float(f"{(idx % 5) + 10}.{(idx % 10) * 5}"),  # Mock price
+                    price=_mock_price((idx % 5) + 10, (idx % 10) * 5),  # Mock price
                     points=float(idx * 10),  # Mock points
                     form=float(idx % 5),  # Mock form
+                    race_history=[],
                 )
                 drivers.append(driver)
             return drivers
@@ -89,8 +189,8 @@ class F1DataFetcher:
             return []
 
     # Similarly, this is a placeholder for team data
-    async def get_teams(self) -> List[Team]:
-        """Get the current teams with mock fantasy data.
+    async def _load_teams(self) -> List[Team]:
+        """Fetch the current teams from the API and add mock fantasy data.
 
         Returns:
             List of Team objects with mock fantasy data
@@ -99,7 +199,7 @@ class F1DataFetcher:
         try:
             response = await self.client.get(url)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             teams = []
             for idx, team_data in enumerate(data["MRData"]["ConstructorTable"]["Constructors"]):
@@ -107,9 +207,10 @@ class F1DataFetcher:
                 team = Team(
                     id=idx + 1,
                     name=team_data["name"],
-                    price=float(f"{(idx % 3) + 20}.{idx * 5}"),  # Mock price
+                    price=_mock_price((idx % 3) + 20, idx * 5),  # Mock price
                     points=float(idx * 15),  # Mock points
                     form=float((idx % 5) + 1),  # Mock form
+                    race_history=[],
                 )
                 teams.append(team)
             return teams
@@ -3,10 +3,29 @@
 from datetime import datetime
 from typing import List, Optional
 
+import numpy as np
 from pydantic import BaseModel, Field
 
 
-class Driver(BaseModel):
+class _ValueMixin:
+    """Derived values shared by the Driver and Team models.
+
+    Both are computed on access, so they always reflect the current fields, including
+    after in-place edits of race_history or model_copy(update=...).
+    """
+
+    @property
+    def value(self) -> float:
+        """Points per million spent."""
+        return self.points / self.price if self.price > 0 else 0.0
+
+    @property
+    def race_history_array(self) -> np.ndarray:
+        """Race history as a float32 array for vectorized trend calculations."""
+        return np.asarray(self.race_history, dtype=np.float32)
+
+
+class Driver(_ValueMixin, BaseModel):
     """F1 Driver model."""
 
     id: int
@@ -18,7 +37,7 @@ class Driver(BaseModel):
     race_history: List[float] = Field(default_factory=list)
 
 
-class Team(BaseModel):
+class Team(_ValueMixin, BaseModel):
     """F1 Team model."""
 
     id: int
@@ -50,4 +69,27 @@ class FantasyTeam(BaseModel):
     drivers: List[Driver] = Field(default_factory=list)
     constructor: Optional[Team] = None
     created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now) 
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class DriverValue(BaseModel):
+    """Driver with its value efficiency (points per million)."""
+
+    driver: Driver
+    value_efficiency: float
+
+
+class TeamValue(BaseModel):
+    """Team with its value efficiency (points per million)."""
+
+    team: Team
+    value_efficiency: float
+
+
+class OptimalTeam(BaseModel):
+    """Optimal team selection within a budget."""
+
+    drivers: List[Driver]
+    team: Optional[Team] = None
+    total_cost: float
+    remaining_budget: float
@@ -3,36 +3,242 @@
 Module for accessing F1 Fantasy driver and constructor prices data.
 """
 
-import sqlite3
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
 import pathlib
+import sqlite3
+import threading
+import weakref
+from datetime import datetime
+from itertools import batched
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Default database file path
+DB_FILE = os.path.join(pathlib.Path(__file__).parent.parent.parent, 'data', 'f1_fantasy.db')
+
+class _PooledConnection:
+    """A pooled connection and the Prices instances currently using it."""
+    
+    __slots__ = ('conn', 'users', 'closed', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.users: 'weakref.WeakSet[Prices]' = weakref.WeakSet()
+        self.closed = False
+    
+    def close(self) -> None:
+        """Close the connection; the owning thread opens a new one on next use."""
+        self.closed = True
+        self.conn.close()
+    
+    def __del__(self) -> None:
+        """Close the connection when its thread exits and drops the pool entry."""
+        self.conn.close()
+
+# Connections shared across Prices instances, kept per thread (keyed by database path
+# and read-only flag) so no cursor or transaction is ever shared between threads. A
+# thread's connections are closed when it exits
+_THREAD_POOL = threading.local()
+# Every open pooled connection, so close() and close_pool() can reach those of other
+# threads; held weakly so exited threads' connections are not kept alive
+_OPEN_CONNECTIONS: 'weakref.WeakSet[_PooledConnection]' = weakref.WeakSet()
+_POOL_LOCK = threading.Lock()
+
+# Names bound per query in bulk name lookups, well under SQLite's variable limit
+NAME_LOOKUP_BATCH_SIZE = 500
+
+def _db_timestamp(value: datetime) -> str:
+    """
+    Format a datetime the way the price tables store timestamps.
+    
+    Binding the text directly avoids sqlite3's deprecated default datetime adapter,
+    and matches the format written by create_prices_db.
+    """
+    return value.isoformat(' ')
+
+def _latest_prices_query(table: str, id_column: str, dated: bool) -> str:
+    """
+    Build a query for the most recent price of every driver or team.
+    
+    The query is self-contained, so it works on databases without the indexes and
+    views that create_prices_db adds (the indexes only make it faster).
+    
+    Args:
+        table: Price table to read (driver_prices or team_prices)
+        id_column: ID column of the price table
+        dated: Only consider prices effective on or before a date bound as the
+            single query parameter
+        
+    Returns:
+        SQL selecting (id_column, price) rows
+    """
+    where = 'WHERE effective_date <= ?' if dated else ''
+    return f'''
+        SELECT {id_column}, price
+        FROM (
+            SELECT {id_column}, price,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {id_column} ORDER BY effective_date DESC
+                   ) AS rn
+            FROM {table}
+            {where}
+        )
+        WHERE rn = 1
+    '''
 
 class Prices:
     """Class for accessing F1 Fantasy driver and constructor prices."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = DB_FILE, readonly: bool = False):
         """
         Initialize the Prices class.
         
         Args:
             db_path: Path to the SQLite database file
+            readonly: Open the database read-only
         """
-        if db_path is None:
-            # Default path is in the data directory at the project root
-            root_dir = pathlib.Path(__file__).parent.parent.parent
-            db_path = os.path.join(root_dir, 'data', 'f1_fantasy.db')
-        
         self.db_path = db_path
+        self.readonly = readonly
         
         # Ensure the database exists
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Database file not found: {db_path}")
+        
+        # Latest prices keyed by ID, loaded on first use and dropped whenever the
+        # database version they were loaded at changes
+        self._driver_price_cache: Optional[Dict[int, float]] = None
+        self._team_price_cache: Optional[Dict[int, float]] = None
+        self._price_cache_version: Optional[Tuple[int, int, int]] = None
+        
+        # Drivers and teams keyed by name, loaded on first name lookup
+        self._driver_name_cache: Dict[str, Dict[str, Any]] = {}
+        self._team_name_cache: Dict[str, Dict[str, Any]] = {}
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a connection to the SQLite database."""
-        return sqlite3.connect(self.db_path)
+        """
+        Get the pooled connection to the SQLite database for the calling thread.
+        
+        Each thread gets its own connection, shared by every Prices instance using
+        the same database file and mode in that thread. It stays open until the last
+        instance using it is closed, close_pool() is called or the thread exits. The
+        PRAGMAs are set once, when the connection is first opened.
+        """
+        pool = getattr(_THREAD_POOL, 'connections', None)
+        if pool is None:
+            pool = _THREAD_POOL.connections = {}
+        
+        key = (self.db_path, self.readonly)
+        pooled = pool.get(key)
+        if pooled is None or pooled.closed:
+            pooled = pool[key] = _PooledConnection(self._connect())
+            with _POOL_LOCK:
+                _OPEN_CONNECTIONS.add(pooled)
+        if self not in pooled.users:
+            with _POOL_LOCK:
+                pooled.users.add(self)
+        return pooled.conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new connection to this instance's database file."""
+        if self.readonly:
+            # Read-only connections take no write locks and create no journal
+            uri = f'{pathlib.Path(self.db_path).resolve().as_uri()}?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute('PRAGMA mmap_size=268435456')
+        else:
+            # The connection is only used by the thread that opened it; close_pool()
+            # may still close it from another thread
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Per-connection tuning only; the journal mode is a property of the
+            # file and is left to whoever creates it
+            conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        return conn
+    
+    def close(self) -> None:
+        """
+        Release this instance's pooled connections.
+        
+        A connection is closed once no other open instance is using it.
+        """
+        released = []
+        with _POOL_LOCK:
+            for pooled in list(_OPEN_CONNECTIONS):
+                if self not in pooled.users:
+                    continue
+                pooled.users.discard(self)
+                if not pooled.users:
+                    _OPEN_CONNECTIONS.discard(pooled)
+                    released.append(pooled)
+        for pooled in released:
+            pooled.close()
+    
+    def __enter__(self) -> 'Prices':
+        """Use the instance as a context manager that releases its connections on exit."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Release the pooled connections when leaving the context."""
+        self.close()
+    
+    @classmethod
+    def close_pool(cls) -> None:
+        """Close all pooled database connections."""
+        with _POOL_LOCK:
+            pooled_connections = list(_OPEN_CONNECTIONS)
+            _OPEN_CONNECTIONS.clear()
+        for pooled in pooled_connections:
+            pooled.close()
+    
+    def _load_latest_prices(self, table: str, id_column: str) -> Dict[int, float]:
+        """
+        Load the most recent price for every driver or team in a single query.
+        
+        Args:
+            table: Price table to read (driver_prices or team_prices)
+            id_column: ID column of the price table
+            
+        Returns:
+            Dictionary mapping IDs to their latest price
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(_latest_prices_query(table, id_column, dated=False))
+        
+        prices = dict(cursor.fetchall())
+        return prices
+    
+    def _database_version(self) -> Tuple[int, int, int]:
+        """
+        Identify the state of the database as seen by this thread's connection.
+        
+        PRAGMA data_version changes when any other connection (in this or another
+        process) commits, and total_changes when this connection writes, so together
+        they tell when cached prices may be stale.
+        """
+        conn = self._get_connection()
+        return id(conn), conn.execute('PRAGMA data_version').fetchone()[0], conn.total_changes
+    
+    def _refresh_price_cache(self) -> None:
+        """Discard cached latest prices if the database changed since they were loaded."""
+        version = self._database_version()
+        if version != self._price_cache_version:
+            self.invalidate_price_cache()
+            self._price_cache_version = version
+    
+    def invalidate_price_cache(self) -> None:
+        """Discard cached latest prices so the next lookup reloads them."""
+        self._driver_price_cache = None
+        self._team_price_cache = None
+    
+    def clear_name_cache(self) -> None:
+        """Discard cached driver and team name lookups, e.g. after new ones are added."""
+        self._driver_name_cache.clear()
+        self._team_name_cache.clear()
     
     def get_all_drivers(self) -> List[Dict[str, Any]]:
         """
@@ -50,16 +256,14 @@ class Prices:
             LEFT JOIN teams t ON d.team_id = t.id
         ''')
         
-        drivers = []
-        for row in cursor.fetchall():
-            drivers.append({
+        return [
+            {
                 'id': row[0],
                 'name': row[1],
                 'team': row[2]
-            })
-        
-        conn.close()
-        return drivers
+            }
+            for row in cursor
+        ]
     
     def get_all_teams(self) -> List[Dict[str, Any]]:
         """
@@ -73,15 +277,13 @@ class Prices:
         
         cursor.execute('SELECT id, name FROM teams')
         
-        teams = []
-        for row in cursor.fetchall():
-            teams.append({
+        return [
+            {
                 'id': row[0],
                 'name': row[1]
-            })
-        
-        conn.close()
-        return teams
+            }
+            for row in cursor
+        ]
     
     def get_driver_price(self, driver_id: int, date: Optional[datetime] = None) -> float:
         """
@@ -95,28 +297,26 @@ class Prices:
         Returns:
             Price of the driver
         """
+        if date is None:
+            self._refresh_price_cache()
+            if self._driver_price_cache is None:
+                self._driver_price_cache = self._load_latest_prices('driver_prices', 'driver_id')
+            if driver_id in self._driver_price_cache:
+                return self._driver_price_cache[driver_id]
+            raise ValueError(f"No price found for driver ID {driver_id}")
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if date:
-            cursor.execute('''
-                SELECT price
-                FROM driver_prices
-                WHERE driver_id = ? AND effective_date <= ?
-                ORDER BY effective_date DESC
-                LIMIT 1
-            ''', (driver_id, date))
-        else:
-            cursor.execute('''
-                SELECT price
-                FROM driver_prices
-                WHERE driver_id = ?
-                ORDER BY effective_date DESC
-                LIMIT 1
-            ''', (driver_id,))
+        cursor.execute('''
+            SELECT price
+            FROM driver_prices
+            WHERE driver_id = ? AND effective_date <= ?
+            ORDER BY effective_date DESC
+            LIMIT 1
+        ''', (driver_id, _db_timestamp(date)))
         
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             return result[0]
@@ -135,28 +335,26 @@ class Prices:
         Returns:
             Price of the team
         """
+        if date is None:
+            self._refresh_price_cache()
+            if self._team_price_cache is None:
+                self._team_price_cache = self._load_latest_prices('team_prices', 'team_id')
+            if team_id in self._team_price_cache:
+                return self._team_price_cache[team_id]
+            raise ValueError(f"No price found for team ID {team_id}")
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if date:
-            cursor.execute('''
-                SELECT price
-                FROM team_prices
-                WHERE team_id = ? AND effective_date <= ?
-                ORDER BY effective_date DESC
-                LIMIT 1
-            ''', (team_id, date))
-        else:
-            cursor.execute('''
-                SELECT price
-                FROM team_prices
-                WHERE team_id = ?
-                ORDER BY effective_date DESC
-                LIMIT 1
-            ''', (team_id,))
+        cursor.execute('''
+            SELECT price
+            FROM team_prices
+            WHERE team_id = ? AND effective_date <= ?
+            ORDER BY effective_date DESC
+            LIMIT 1
+        ''', (team_id, _db_timestamp(date)))
         
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             return result[0]
@@ -183,15 +381,13 @@ class Prices:
             ORDER BY effective_date
         ''', (driver_id,))
         
-        history = []
-        for row in cursor.fetchall():
-            history.append({
+        return [
+            {
                 'price': row[0],
                 'date': row[1]
-            })
-        
-        conn.close()
-        return history
+            }
+            for row in cursor
+        ]
     
     def get_team_price_history(self, team_id: int) -> List[Dict[str, Any]]:
         """
@@ -213,73 +409,118 @@ class Prices:
             ORDER BY effective_date
         ''', (team_id,))
         
-        history = []
-        for row in cursor.fetchall():
-            history.append({
+        return [
+            {
                 'price': row[0],
                 'date': row[1]
-            })
-        
-        conn.close()
-        return history
+            }
+            for row in cursor
+        ]
     
     def get_driver_by_name(self, name: str) -> Dict[str, Any]:
         """
         Get driver information by name.
         
+        All drivers are loaded in one query on first use and then served from memory.
+        A name missing from memory, e.g. a driver added since, is looked up on its
+        own; only drivers that are found are remembered.
+        
         Args:
             name: Name of the driver
             
         Returns:
             Dictionary containing driver information
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT d.id, d.name, t.name as team_name
-            FROM drivers d
-            LEFT JOIN teams t ON d.team_id = t.id
-            WHERE d.name = ?
-        ''', (name,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        if not self._driver_name_cache:
+            self._driver_name_cache = {d['name']: d for d in self.get_all_drivers()}
         
-        if row:
-            return {
-                'id': row[0],
-                'name': row[1],
-                'team': row[2]
-            }
-        else:
-            raise ValueError(f"Driver not found: {name}")
+        driver = self._driver_name_cache.get(name)
+        if driver is None:
+            cursor = self._get_connection().cursor()
+            cursor.execute('''
+                SELECT d.id, d.name, t.name as team_name
+                FROM drivers d
+                LEFT JOIN teams t ON d.team_id = t.id
+                WHERE d.name = ?
+            ''', (name,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Driver not found: {name}")
+            driver = self._driver_name_cache[name] = {'id': row[0], 'name': row[1], 'team': row[2]}
+        return dict(driver)
     
     def get_team_by_name(self, name: str) -> Dict[str, Any]:
         """
         Get team information by name.
         
+        All teams are loaded in one query on first use and then served from memory.
+        A name missing from memory is looked up on its own; only teams that are found
+        are remembered.
+        
         Args:
             name: Name of the team
             
         Returns:
             Dictionary containing team information
         """
+        if not self._team_name_cache:
+            self._team_name_cache = {t['name']: t for t in self.get_all_teams()}
+        
+        team = self._team_name_cache.get(name)
+        if team is None:
+            cursor = self._get_connection().cursor()
+            cursor.execute('SELECT id, name FROM teams WHERE name = ?', (name,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Team not found: {name}")
+            team = self._team_name_cache[name] = {'id': row[0], 'name': row[1]}
+        return dict(team)
+    
+    def _get_ids_by_name(self, table: str, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Look up the IDs of many drivers or teams with one query per batch of names.
+        
+        Args:
+            table: Table to search (drivers or teams)
+            names: Names to look up
+            
+        Returns:
+            Dictionary mapping each name that was found to its ID
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT id, name FROM teams WHERE name = ?', (name,))
+        ids = {}
+        for batch in batched(dict.fromkeys(names), NAME_LOOKUP_BATCH_SIZE, strict=False):
+            placeholders = ','.join('?' * len(batch))
+            cursor.execute(f'SELECT name, id FROM {table} WHERE name IN ({placeholders})', batch)
+            ids.update(cursor.fetchall())
         
-        row = cursor.fetchone()
-        conn.close()
+        return ids
+    
+    def get_driver_ids_by_name(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the IDs of several drivers by name.
         
-        if row:
-            return {
-                'id': row[0],
-                'name': row[1]
-            }
-        else:
-            raise ValueError(f"Team not found: {name}")
+        Args:
+            names: Names of the drivers
+            
+        Returns:
+            Dictionary mapping driver names to IDs; names not found are omitted
+        """
+        return self._get_ids_by_name('drivers', names)
+    
+    def get_team_ids_by_name(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the IDs of several teams by name.
+        
+        Args:
+            names: Names of the teams
+            
+        Returns:
+            Dictionary mapping team names to IDs; names not found are omitted
+        """
+        return self._get_ids_by_name('teams', names)
     
     def add_driver_price(self, driver_id: int, price: float, effective_date: datetime) -> None:
         """
@@ -290,16 +531,25 @@ class Prices:
             price: New price
             effective_date: Date when the price becomes effective
         """
+        self.add_driver_prices([(driver_id, price, effective_date)])
+    
+    def add_driver_prices(self, rows: Iterable[Tuple[int, float, datetime]]) -> None:
+        """
+        Add many driver prices in a single transaction.
+        
+        Args:
+            rows: (driver_id, price, effective_date) tuples
+        """
         conn = self._get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO driver_prices (driver_id, price, effective_date)
-            VALUES (?, ?, ?)
-        ''', (driver_id, price, effective_date))
+        rows = ((item_id, price, _db_timestamp(date)) for item_id, price, date in rows)
+        with conn:
+            conn.executemany('''
+                INSERT INTO driver_prices (driver_id, price, effective_date)
+                VALUES (?, ?, ?)
+            ''', rows)
         
-        conn.commit()
-        conn.close()
+        self._driver_price_cache = None
     
     def add_team_price(self, team_id: int, price: float, effective_date: datetime) -> None:
         """
@@ -310,64 +560,92 @@ class Prices:
             price: New price
             effective_date: Date when the price becomes effective
         """
+        self.add_team_prices([(team_id, price, effective_date)])
+    
+    def add_team_prices(self, rows: Iterable[Tuple[int, float, datetime]]) -> None:
+        """
+        Add many team prices in a single transaction.
+        
+        Args:
+            rows: (team_id, price, effective_date) tuples
+        """
+        conn = self._get_connection()
+        
+        rows = ((item_id, price, _db_timestamp(date)) for item_id, price, date in rows)
+        with conn:
+            conn.executemany('''
+                INSERT INTO team_prices (team_id, price, effective_date)
+                VALUES (?, ?, ?)
+            ''', rows)
+        
+        self._team_price_cache = None
+    
+    def _execute_drivers_with_prices(self, date: Optional[datetime] = None) -> sqlite3.Cursor:
+        """
+        Run the query listing every driver with their team and price.
+        
+        Args:
+            date: Date for which to get the prices (optional)
+            
+        Returns:
+            Cursor over (id, name, team_name, price) rows
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO team_prices (team_id, price, effective_date)
-            VALUES (?, ?, ?)
-        ''', (team_id, price, effective_date))
+        latest = _latest_prices_query('driver_prices', 'driver_id', dated=bool(date))
+        cursor.execute(f'''
+            WITH latest AS ({latest})
+            SELECT d.id, d.name, t.name as team_name, l.price
+            FROM drivers d
+            LEFT JOIN teams t ON d.team_id = t.id
+            LEFT JOIN latest l ON l.driver_id = d.id
+        ''', (_db_timestamp(date),) if date else ())
         
-        conn.commit()
-        conn.close()
+        return cursor
     
-    def get_all_drivers_with_prices(self, date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    def _execute_teams_with_prices(self, date: Optional[datetime] = None) -> sqlite3.Cursor:
         """
-        Get all drivers with their current prices and teams.
+        Run the query listing every team with its price.
         
         Args:
             date: Date for which to get the prices (optional)
             
         Returns:
-            List of dictionaries containing driver information with prices
+            Cursor over (id, name, price) rows
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if date:
-            cursor.execute('''
-                SELECT d.id, d.name, t.name as team_name, 
-                       (SELECT dp.price 
-                        FROM driver_prices dp 
-                        WHERE dp.driver_id = d.id AND dp.effective_date <= ? 
-                        ORDER BY dp.effective_date DESC 
-                        LIMIT 1) as price
-                FROM drivers d
-                LEFT JOIN teams t ON d.team_id = t.id
-            ''', (date,))
-        else:
-            cursor.execute('''
-                SELECT d.id, d.name, t.name as team_name, 
-                       (SELECT dp.price 
-                        FROM driver_prices dp 
-                        WHERE dp.driver_id = d.id 
-                        ORDER BY dp.effective_date DESC 
-                        LIMIT 1) as price
-                FROM drivers d
-                LEFT JOIN teams t ON d.team_id = t.id
-            ''')
+        latest = _latest_prices_query('team_prices', 'team_id', dated=bool(date))
+        cursor.execute(f'''
+            WITH latest AS ({latest})
+            SELECT t.id, t.name, l.price
+            FROM teams t
+            LEFT JOIN latest l ON l.team_id = t.id
+        ''', (_db_timestamp(date),) if date else ())
+        
+        return cursor
+    
+    def get_all_drivers_with_prices(self, date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Get all drivers with their current prices and teams.
         
-        drivers = []
-        for row in cursor.fetchall():
-            drivers.append({
+        Args:
+            date: Date for which to get the prices (optional)
+            
+        Returns:
+            List of dictionaries containing driver information with prices
+        """
+        return [
+            {
                 'id': row[0],
                 'name': row[1],
                 'team': row[2],
                 'price': row[3]
-            })
-        
-        conn.close()
-        return drivers
+            }
+            for row in self._execute_drivers_with_prices(date)
+        ]
     
     def get_all_teams_with_prices(self, date: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
@@ -379,37 +657,50 @@ class Prices:
         Returns:
             List of dictionaries containing team information with prices
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        if date:
-            cursor.execute('''
-                SELECT t.id, t.name, 
-                       (SELECT tp.price 
-                        FROM team_prices tp 
-                        WHERE tp.team_id = t.id AND tp.effective_date <= ? 
-                        ORDER BY tp.effective_date DESC 
-                        LIMIT 1) as price
-                FROM teams t
-            ''', (date,))
-        else:
-            cursor.execute('''
-                SELECT t.id, t.name, 
-                       (SELECT tp.price 
-                        FROM team_prices tp 
-                        WHERE tp.team_id = t.id 
-                        ORDER BY tp.effective_date DESC 
-                        LIMIT 1) as price
-                FROM teams t
-            ''')
-        
-        teams = []
-        for row in cursor.fetchall():
-            teams.append({
+        return [
+            {
                 'id': row[0],
                 'name': row[1],
                 'price': row[2]
-            })
+            }
+            for row in self._execute_teams_with_prices(date)
+        ]
+    
+    def get_drivers_with_prices_frame(self, date: Optional[datetime] = None) -> 'pl.DataFrame':
+        """
+        Get all drivers with their prices and teams as a DataFrame.
+        
+        The rows are loaded straight into columns without building a dict per driver.
+        Polars is imported here so the dict-based API doesn't need it.
+        
+        Args:
+            date: Date for which to get the prices (optional)
+            
+        Returns:
+            DataFrame with id, name, team and price columns
+        """
+        import polars as pl
+        
+        return pl.DataFrame(
+            self._execute_drivers_with_prices(date).fetchall(),
+            schema={'id': pl.Int64, 'name': pl.String, 'team': pl.String, 'price': pl.Float64},
+            orient='row'
+        )
+    
+    def get_teams_with_prices_frame(self, date: Optional[datetime] = None) -> 'pl.DataFrame':
+        """
+        Get all teams with their prices as a DataFrame.
+        
+        Args:
+            date: Date for which to get the prices (optional)
+            
+        Returns:
+            DataFrame with id, name and price columns
+        """
+        import polars as pl
         
-        conn.close()
-        return teams 
\ No newline at end of file
+        return pl.DataFrame(
+            self._execute_teams_with_prices(date).fetchall(),
+            schema={'id': pl.Int64, 'name': pl.String, 'price': pl.Float64},
+            orient='row'
+        )
\ No newline at end of file
@@ -60,22 +60,10 @@ def generate_sample_data():
     # Add scrape date to the data
     scrape_date = datetime.now().isoformat()
     
-    drivers = []
-    for driver in SAMPLE_DRIVERS:
-        drivers.append({
-            "name": driver["name"],
-            "team": driver["team"],
-            "price": driver["price"],
-            "scrape_date": scrape_date
-        })
-    
-    constructors = []
-    for constructor in SAMPLE_CONSTRUCTORS:
-        constructors.append({
-            "name": constructor["name"],
-            "price": constructor["price"],
-            "scrape_date": scrape_date
-        })
+    drivers = [{**driver, "scrape_date": scrape_date} for driver in SAMPLE_DRIVERS]
+    constructors = [
+        {**constructor, "scrape_date": scrape_date} for constructor in SAMPLE_CONSTRUCTORS
+    ]
     
     # Save the data to JSON files
     save_data_to_json(drivers, constructors)
@@ -87,13 +75,13 @@ def save_data_to_json(drivers, constructors):
     # Save driver data
     drivers_json_path = os.path.join(DATA_DIR, 'f1_fantasy_drivers.json')
     with open(drivers_json_path, "w", encoding="utf-8") as f:
-        json.dump(drivers, f, indent=2)
+        f.write(json.dumps(drivers, indent=2))
     print(f"Sample driver data saved to {drivers_json_path}")
     
     # Save constructor data
     constructors_json_path = os.path.join(DATA_DIR, 'f1_fantasy_constructors.json')
     with open(constructors_json_path, "w", encoding="utf-8") as f:
-        json.dump(constructors, f, indent=2)
+        f.write(json.dumps(constructors, indent=2))
     print(f"Sample constructor data saved to {constructors_json_path}")
 
 if __name__ == "__main__":
@@ -2,22 +2,28 @@
 Module for accessing F1 Fantasy scoring rules from the database.
 """
 
-import sqlite3
 import os
+import pathlib
+import sqlite3
+import threading
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Union, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
 
 # Database file path
-DB_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'f1_fantasy.db')
+DB_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'f1_fantasy.db'
+)
 
-@dataclass
+@dataclass(slots=True)
 class ScoringCategory:
     """Class representing a scoring category."""
     id: int
     name: str
     description: str
 
-@dataclass
+@dataclass(slots=True)
 class ScoringRule:
     """Class representing a scoring rule."""
     id: int
@@ -26,13 +32,13 @@ class ScoringRule:
     points: int
     description: str
 
-@dataclass
+@dataclass(slots=True)
 class PositionPoints:
     """Class representing position-based points."""
     position: int
     points: int
 
-@dataclass
+@dataclass(slots=True)
 class ConstructorRule:
     """Class representing a constructor scoring rule."""
     id: int
@@ -40,7 +46,7 @@ class ConstructorRule:
     points: int
     description: str
 
-@dataclass
+@dataclass(slots=True)
 class PriceChangeRule:
     """Class representing a price change rule."""
     id: int
@@ -58,6 +64,14 @@ class ScoringRules:
         """
         self.db_path = db_path
         self._conn = None
+        # Position -> points lookups, loaded once per table on first use
+        self._position_points_cache: Dict[str, Dict[int, int]] = {}
+        # The same tables as arrays indexed by position, for batch scoring
+        self._position_points_arrays: Dict[str, np.ndarray] = {}
+        # Rule lists keyed by table, loaded once per table on first use
+        self._rules_cache: Dict[str, list] = {}
+        # Serialises queries on the shared connection across threads
+        self._lock = threading.Lock()
         
     def _get_connection(self) -> sqlite3.Connection:
         """Get a connection to the database.
@@ -66,15 +80,77 @@ class ScoringRules:
             A SQLite connection object.
         """
         if self._conn is None:
-            self._conn = sqlite3.connect(self.db_path)
-            self._conn.row_factory = sqlite3.Row
+            # Scoring rules are only ever read, so open read-only: no journal files
+            # are created and the rules database can't be modified by accident
+            uri = f'{pathlib.Path(self.db_path).resolve().as_uri()}?mode=ro'
+            # The shared instance may be used from several threads; the connection
+            # is read-only, so sharing it is safe
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._conn.execute('PRAGMA cache_size=-20000')
+            self._conn.execute('PRAGMA temp_store=MEMORY')
+            self._conn.execute('PRAGMA mmap_size=268435456')
         return self._conn
     
+    def _fetch_all(self, sql: str) -> list:
+        """Run a query on the shared connection and return all rows.
+        
+        Args:
+            sql: The SQL query to run.
+            
+        Returns:
+            A list of result rows.
+        """
+        with self._lock:
+            return self._get_connection().execute(sql).fetchall()
+    
     def close(self):
         """Close the database connection."""
         if self._conn is not None:
             self._conn.close()
             self._conn = None
+        self.clear_cache()
+    
+    def __enter__(self) -> 'ScoringRules':
+        """Use the instance as a context manager that closes its connection on exit."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the database connection when leaving the context."""
+        self.close()
+    
+    def clear_cache(self):
+        """Clear the cached rules and position points so they are re-read from the database."""
+        self._position_points_cache.clear()
+        self._position_points_arrays.clear()
+        self._rules_cache.clear()
+    
+    def _get_position_points_map(self, table: str) -> Dict[int, int]:
+        """Get a position points table as a cached position -> points dictionary.
+        
+        Args:
+            table: Name of the position points table.
+            
+        Returns:
+            A dictionary mapping each scored position to its points.
+        """
+        points_by_position = self._position_points_cache.get(table)
+        if points_by_position is None:
+            rows = self._fetch_all(f'SELECT position, points FROM {table}')
+            points_by_position = dict(rows)
+            self._position_points_cache[table] = points_by_position
+        return points_by_position
+    
+    def _get_position_points(self, table: str, position: int) -> int:
+        """Get the points for a single position from a cached position points table.
+        
+        Args:
+            table: Name of the position points table.
+            position: Position to get points for.
+            
+        Returns:
+            The points for that position, or 0 if the position is not scored.
+        """
+        return self._get_position_points_map(table).get(position, 0)
     
     def get_categories(self) -> List[ScoringCategory]:
         """Get all scoring categories.
@@ -82,19 +158,12 @@ class ScoringRules:
         Returns:
             A list of ScoringCategory objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scoring_categories')
-        
-        categories = []
-        for row in cursor.fetchall():
-            categories.append(ScoringCategory(
-                id=row['id'],
-                name=row['name'],
-                description=row['description']
-            ))
-        
-        return categories
+        if 'categories' not in self._rules_cache:
+            rows = self._fetch_all('SELECT id, name, description FROM scoring_categories')
+            categories = [ScoringCategory(*row) for row in rows]
+            self._rules_cache['categories'] = categories
+        
+        return list(self._rules_cache['categories'])
     
     def get_scoring_rules(self, category_id: Optional[int] = None) -> List[ScoringRule]:
         """Get scoring rules, optionally filtered by category.
@@ -105,27 +174,21 @@ class ScoringRules:
         Returns:
             A list of ScoringRule objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        if 'scoring_rules' not in self._rules_cache:
+            rows = self._fetch_all(
+                'SELECT id, category_id, event, points, description FROM scoring_rules'
+            )
+            rules = [ScoringRule(*row) for row in rows]
+            self._rules_cache['scoring_rules'] = rules
         
+        rules = self._rules_cache['scoring_rules']
         if category_id is not None:
-            cursor.execute('SELECT * FROM scoring_rules WHERE category_id = ?', (category_id,))
-        else:
-            cursor.execute('SELECT * FROM scoring_rules')
-        
-        rules = []
-        for row in cursor.fetchall():
-            rules.append(ScoringRule(
-                id=row['id'],
-                category_id=row['category_id'],
-                event=row['event'],
-                points=row['points'],
-                description=row['description']
-            ))
-        
-        return rules
+            return [rule for rule in rules if rule.category_id == category_id]
+        return list(rules)
     
-    def get_qualifying_position_points(self, position: Optional[int] = None) -> Union[List[PositionPoints], int]:
+    def get_qualifying_position_points(
+        self, position: Optional[int] = None
+    ) -> Union[List[PositionPoints], int]:
         """Get qualifying position points.
         
         Args:
@@ -135,24 +198,16 @@ class ScoringRules:
             If position is provided, returns the points for that position.
             Otherwise, returns a list of PositionPoints objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         if position is not None:
-            cursor.execute('SELECT points FROM qualifying_position_points WHERE position = ?', (position,))
-            row = cursor.fetchone()
-            return row['points'] if row else 0
+            return self._get_position_points('qualifying_position_points', position)
         else:
-            cursor.execute('SELECT * FROM qualifying_position_points ORDER BY position')
-            points = []
-            for row in cursor.fetchall():
-                points.append(PositionPoints(
-                    position=row['position'],
-                    points=row['points']
-                ))
-            return points
+            points_by_position = self._get_position_points_map('qualifying_position_points')
+            return [PositionPoints(position=p, points=points)
+                    for p, points in sorted(points_by_position.items())]
     
-    def get_race_position_points(self, position: Optional[int] = None) -> Union[List[PositionPoints], int]:
+    def get_race_position_points(
+        self, position: Optional[int] = None
+    ) -> Union[List[PositionPoints], int]:
         """Get race position points.
         
         Args:
@@ -162,22 +217,12 @@ class ScoringRules:
             If position is provided, returns the points for that position.
             Otherwise, returns a list of PositionPoints objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         if position is not None:
-            cursor.execute('SELECT points FROM race_position_points WHERE position = ?', (position,))
-            row = cursor.fetchone()
-            return row['points'] if row else 0
+            return self._get_position_points('race_position_points', position)
         else:
-            cursor.execute('SELECT * FROM race_position_points ORDER BY position')
-            points = []
-            for row in cursor.fetchall():
-                points.append(PositionPoints(
-                    position=row['position'],
-                    points=row['points']
-                ))
-            return points
+            points_by_position = self._get_position_points_map('race_position_points')
+            return [PositionPoints(position=p, points=points)
+                    for p, points in sorted(points_by_position.items())]
     
     def get_constructor_rules(self) -> List[ConstructorRule]:
         """Get constructor scoring rules.
@@ -185,20 +230,14 @@ class ScoringRules:
         Returns:
             A list of ConstructorRule objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM constructor_scoring_rules')
-        
-        rules = []
-        for row in cursor.fetchall():
-            rules.append(ConstructorRule(
-                id=row['id'],
-                event=row['event'],
-                points=row['points'],
-                description=row['description']
-            ))
-        
-        return rules
+        if 'constructor_rules' not in self._rules_cache:
+            rows = self._fetch_all(
+                'SELECT id, event, points, description FROM constructor_scoring_rules'
+            )
+            rules = [ConstructorRule(*row) for row in rows]
+            self._rules_cache['constructor_rules'] = rules
+        
+        return list(self._rules_cache['constructor_rules'])
     
     def get_price_change_rules(self) -> List[PriceChangeRule]:
         """Get price change rules.
@@ -206,19 +245,12 @@ class ScoringRules:
         Returns:
             A list of PriceChangeRule objects.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM price_change_rules')
-        
-        rules = []
-        for row in cursor.fetchall():
-            rules.append(PriceChangeRule(
-                id=row['id'],
-                rule=row['rule'],
-                description=row['description']
-            ))
-        
-        return rules
+        if 'price_change_rules' not in self._rules_cache:
+            rows = self._fetch_all('SELECT id, rule, description FROM price_change_rules')
+            rules = [PriceChangeRule(*row) for row in rows]
+            self._rules_cache['price_change_rules'] = rules
+        
+        return list(self._rules_cache['price_change_rules'])
     
     def calculate_driver_points(self, 
                                qualifying_position: int, 
@@ -231,7 +263,8 @@ class ScoringRules:
                                driver_of_day: bool = False,
                                beat_teammate_qualifying: bool = False,
                                beat_teammate_race: bool = False,
-                               disqualified: bool = False) -> Tuple[int, Dict[str, int]]:
+                               disqualified: bool = False,
+                               include_breakdown: bool = True) -> Tuple[int, Dict[str, int]]:
         """Calculate points for a driver based on their performance.
         
         Args:
@@ -246,86 +279,32 @@ class ScoringRules:
             beat_teammate_qualifying: Whether the driver beat their teammate in qualifying
             beat_teammate_race: Whether the driver beat their teammate in the race
             disqualified: Whether the driver was disqualified
+            include_breakdown: Whether to build the points breakdown (empty if False)
             
         Returns:
             A tuple containing the total points and a breakdown of points by category
         """
-        points_breakdown = {}
-        
-        # Qualifying position points
-        qualifying_points = self.get_qualifying_position_points(qualifying_position)
-        points_breakdown['qualifying_position'] = qualifying_points
-        
-        # Q3 and Q2 appearance points
-        if q3_appearance:
-            q3_points = 2
-            points_breakdown['q3_appearance'] = q3_points
-        else:
-            q3_points = 0
-            
-        if q2_appearance and not q3_appearance:  # Only award Q2 points if not in Q3
-            q2_points = 1
-            points_breakdown['q2_appearance'] = q2_points
-        else:
-            q2_points = 0
-        
-        # Race position points
-        race_points = self.get_race_position_points(race_position) if not disqualified else 0
-        points_breakdown['race_position'] = race_points
-        
-        # Positions gained/lost
-        if finished_race and not disqualified:
-            positions_changed = grid_position - race_position
-            if positions_changed > 0:
-                position_points = positions_changed * 2
-                points_breakdown['positions_gained'] = position_points
-            elif positions_changed < 0:
-                position_points = positions_changed * 2  # Will be negative
-                points_breakdown['positions_lost'] = position_points
-            else:
-                position_points = 0
-        else:
-            position_points = 0
-        
-        # Finishing/DNF/DSQ points
-        if disqualified:
-            finish_points = -20
-            points_breakdown['disqualified'] = finish_points
-        elif finished_race:
-            finish_points = 1
-            points_breakdown['finished_race'] = finish_points
-        else:
-            finish_points = -15
-            points_breakdown['dnf'] = finish_points
+        qualifying_points = self._get_position_points(
+            'qualifying_position_points', qualifying_position
+        )
+        race_points = 0
+        if not disqualified:
+            race_points = self._get_position_points('race_position_points', race_position)
         
-        # Fastest lap
-        if fastest_lap:
-            fastest_lap_points = 5
-            points_breakdown['fastest_lap'] = fastest_lap_points
-        else:
-            fastest_lap_points = 0
+        # Q2 points are only awarded if the driver didn't reach Q3
+        q3_points = 2 * bool(q3_appearance)
+        q2_points = int(bool(q2_appearance) and not q3_appearance)
         
-        # Driver of the Day
-        if driver_of_day:
-            dotd_points = 10
-            points_breakdown['driver_of_day'] = dotd_points
-        else:
-            dotd_points = 0
+        # Positions gained/lost only count for classified finishers
+        scored_finish = finished_race and not disqualified
+        position_points = 2 * (grid_position - race_position) if scored_finish else 0
+        finish_points = -20 if disqualified else (1 if finished_race else -15)
         
-        # Beat teammate
-        if beat_teammate_qualifying:
-            beat_qualifying_points = 2
-            points_breakdown['beat_teammate_qualifying'] = beat_qualifying_points
-        else:
-            beat_qualifying_points = 0
-            
-        if beat_teammate_race:
-            beat_race_points = 3
-            points_breakdown['beat_teammate_race'] = beat_race_points
-        else:
-            beat_race_points = 0
+        fastest_lap_points = 5 * bool(fastest_lap)
+        dotd_points = 10 * bool(driver_of_day)
+        beat_qualifying_points = 2 * bool(beat_teammate_qualifying)
+        beat_race_points = 3 * bool(beat_teammate_race)
         
-        # Calculate total points
         total_points = (
             qualifying_points + 
             q3_points + 
@@ -339,10 +318,127 @@ class ScoringRules:
             beat_race_points
         )
         
+        if not include_breakdown:
+            return total_points, {}
+        
+        points_breakdown = {'qualifying_position': qualifying_points}
+        if q3_points:
+            points_breakdown['q3_appearance'] = q3_points
+        if q2_points:
+            points_breakdown['q2_appearance'] = q2_points
+        points_breakdown['race_position'] = race_points
+        if position_points > 0:
+            points_breakdown['positions_gained'] = position_points
+        elif position_points < 0:
+            points_breakdown['positions_lost'] = position_points
+        if disqualified:
+            points_breakdown['disqualified'] = finish_points
+        elif finished_race:
+            points_breakdown['finished_race'] = finish_points
+        else:
+            points_breakdown['dnf'] = finish_points
+        if fastest_lap_points:
+            points_breakdown['fastest_lap'] = fastest_lap_points
+        if dotd_points:
+            points_breakdown['driver_of_day'] = dotd_points
+        if beat_qualifying_points:
+            points_breakdown['beat_teammate_qualifying'] = beat_qualifying_points
+        if beat_race_points:
+            points_breakdown['beat_teammate_race'] = beat_race_points
+        
         return total_points, points_breakdown
+    
+    def _get_position_points_table(self, table: str) -> np.ndarray:
+        """Get a position points table as an array indexed by position.
+        
+        Args:
+            table: Name of the position points table.
+            
+        Returns:
+            An array where element ``i`` holds the points for position ``i``.
+        """
+        points_table = self._position_points_arrays.get(table)
+        if points_table is None:
+            points_by_position = self._get_position_points_map(table)
+            size = max(points_by_position, default=0) + 1
+            points_table = np.zeros(size, dtype=np.int32)
+            for position, points in points_by_position.items():
+                if position >= 0:
+                    points_table[position] = points
+            points_table.setflags(write=False)
+            self._position_points_arrays[table] = points_table
+        return points_table
+    
+    def calculate_driver_points_batch(self,
+                                      qualifying_positions: np.ndarray,
+                                      race_positions: np.ndarray,
+                                      grid_positions: np.ndarray,
+                                      finished_race: Optional[np.ndarray] = None,
+                                      fastest_lap: Optional[np.ndarray] = None,
+                                      q3_appearance: Optional[np.ndarray] = None,
+                                      q2_appearance: Optional[np.ndarray] = None,
+                                      driver_of_day: Optional[np.ndarray] = None,
+                                      beat_teammate_qualifying: Optional[np.ndarray] = None,
+                                      beat_teammate_race: Optional[np.ndarray] = None,
+                                      disqualified: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate points for many drivers at once.
+        
+        Applies the same rules as calculate_driver_points to arrays with one entry
+        per driver. Omitted flags default to the scalar method's defaults.
+        
+        Args:
+            qualifying_positions: Qualifying position of each driver
+            race_positions: Race position of each driver
+            grid_positions: Grid position of each driver
+            finished_race: Whether each driver finished the race
+            fastest_lap: Whether each driver set the fastest lap
+            q3_appearance: Whether each driver appeared in Q3
+            q2_appearance: Whether each driver appeared in Q2
+            driver_of_day: Whether each driver was voted Driver of the Day
+            beat_teammate_qualifying: Whether each driver beat their teammate in qualifying
+            beat_teammate_race: Whether each driver beat their teammate in the race
+            disqualified: Whether each driver was disqualified
+            
+        Returns:
+            An int32 array with the total points of each driver
+        """
+        qualifying_positions = np.asarray(qualifying_positions, dtype=np.int64)
+        race_positions = np.asarray(race_positions, dtype=np.int64)
+        grid_positions = np.asarray(grid_positions, dtype=np.int64)
+        n = len(race_positions)
+        
+        def flag(values: Optional[np.ndarray], default: bool) -> np.ndarray:
+            if values is None:
+                return np.full(n, default, dtype=bool)
+            return np.asarray(values, dtype=bool)
+        
+        def lookup(table: str, positions: np.ndarray) -> np.ndarray:
+            points_table = self._get_position_points_table(table)
+            in_range = (positions >= 0) & (positions < len(points_table))
+            return np.where(in_range, points_table[np.clip(positions, 0, len(points_table) - 1)], 0)
+        
+        finished_race = flag(finished_race, True)
+        q3_appearance = flag(q3_appearance, False)
+        disqualified = flag(disqualified, False)
+        
+        total_points = lookup('qualifying_position_points', qualifying_positions)
+        total_points += 2 * q3_appearance
+        total_points += flag(q2_appearance, False) & ~q3_appearance
+        total_points += np.where(disqualified, 0, lookup('race_position_points', race_positions))
+        total_points += np.where(
+            finished_race & ~disqualified, (grid_positions - race_positions) * 2, 0
+        )
+        total_points += np.where(disqualified, -20, np.where(finished_race, 1, -15))
+        total_points += 5 * flag(fastest_lap, False)
+        total_points += 10 * flag(driver_of_day, False)
+        total_points += 2 * flag(beat_teammate_qualifying, False)
+        total_points += 3 * flag(beat_teammate_race, False)
+        
+        return total_points.astype(np.int32)
 
 # Singleton instance
 _instance = None
+_instance_lock = threading.Lock()
 
 def get_scoring_rules() -> ScoringRules:
     """Get the singleton instance of ScoringRules.
@@ -352,5 +448,7 @@ def get_scoring_rules() -> ScoringRules:
     """
     global _instance
     if _instance is None:
-        _instance = ScoringRules()
+        with _instance_lock:
+            if _instance is None:
+                _instance = ScoringRules()
     return _instance 
\ No newline at end of file
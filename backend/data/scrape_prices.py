@@ -3,14 +3,17 @@
 Script to scrape current driver and constructor prices from the F1 Fantasy website.
 """
 
+import asyncio
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import importlib.util
 import json
 import os
 import re
 import pathlib
 from datetime import datetime
-import time
+
+from backend.utils.config import SCRAPE_SAVE_HTML
 
 # Get the project root directory
 ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
@@ -19,10 +22,27 @@ ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
 DATA_DIR = os.path.join(ROOT_DIR, 'data')
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Output files for the scraped data and, when enabled, the raw pages
+DRIVERS_JSON_PATH = os.path.join(DATA_DIR, 'f1_fantasy_drivers.json')
+CONSTRUCTORS_JSON_PATH = os.path.join(DATA_DIR, 'f1_fantasy_constructors.json')
+DRIVERS_HTML_PATH = os.path.join(DATA_DIR, 'f1_fantasy_drivers_page.html')
+CONSTRUCTORS_HTML_PATH = os.path.join(DATA_DIR, 'f1_fantasy_constructors_page.html')
+
 # URLs for the F1 Fantasy statistics pages
 DRIVER_URL = "https://fantasy.formula1.com/en/statistics/details?tab=driver"
 CONSTRUCTOR_URL = "https://fantasy.formula1.com/en/statistics/details?tab=constructor"
 
+# Start of the JSON state object embedded in the statistics pages
+INITIAL_STATE_RE = re.compile(r'window\.__INITIAL_STATE__\s*=\s*')
+JSON_DECODER = json.JSONDecoder()
+
+# Use the C-backed lxml parser when it is installed, falling back to the stdlib one
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Only tables are read from the parsed pages, so skip building tree nodes for
+# everything else
+PAGE_STRAINER = SoupStrainer('table')
+
 def scrape_prices():
     """Scrape current driver and constructor prices from the F1 Fantasy website."""
     print("Fetching current driver and constructor prices...")
@@ -31,9 +51,12 @@ def scrape_prices():
     constructors = []
     
     try:
+        # Fetch both pages concurrently; they are independent requests
+        driver_response, constructor_response = asyncio.run(fetch_pages())
+        
         # Scrape driver prices
         print("Scraping driver prices...")
-        driver_data = scrape_driver_prices()
+        driver_data = scrape_driver_prices(driver_response)
         if driver_data:
             drivers = driver_data
             print(f"Successfully scraped data for {len(drivers)} drivers")
@@ -42,7 +65,7 @@ def scrape_prices():
         
         # Scrape constructor prices
         print("Scraping constructor prices...")
-        constructor_data = scrape_constructor_prices()
+        constructor_data = scrape_constructor_prices(constructor_response)
         if constructor_data:
             constructors = constructor_data
             print(f"Successfully scraped data for {len(constructors)} constructors")
@@ -58,39 +81,86 @@ def scrape_prices():
         print(f"Error scraping prices: {e}")
         return None, None
 
-def scrape_driver_prices():
-    """Scrape driver prices from the F1 Fantasy website."""
+async def fetch_pages():
+    """Fetch the driver and constructor statistics pages concurrently.
+    
+    Returns:
+        Tuple of (driver_response, constructor_response); a page that failed to
+        load is returned as the exception raised while fetching it
+    """
+    async def fetch(client, url):
+        response = await client.get(url)
+        response.raise_for_status()
+        return response
+    
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        return await asyncio.gather(
+            fetch(client, DRIVER_URL),
+            fetch(client, CONSTRUCTOR_URL),
+            return_exceptions=True,
+        )
+
+def extract_initial_state(script_text):
+    """Extract the embedded window.__INITIAL_STATE__ object from a script.
+    
+    The object is decoded straight from where the assignment ends, in a single
+    linear pass that copes with nested braces inside the JSON.
+    
+    Args:
+        script_text: Text of a script element
+        
+    Returns:
+        The decoded state, or None if the script has no valid state object
+    """
+    match = INITIAL_STATE_RE.search(script_text)
+    if not match:
+        return None
+    try:
+        data, _ = JSON_DECODER.raw_decode(script_text, match.end())
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def scrape_driver_prices(response=None):
+    """Scrape driver prices from the F1 Fantasy website.
+    
+    Args:
+        response: Already fetched driver page (or the error fetching it); fetched if None
+    """
     try:
         # Make the HTTP request
-        response = httpx.get(DRIVER_URL, follow_redirects=True)
-        response.raise_for_status()
+        if response is None:
+            response = httpx.get(DRIVER_URL, follow_redirects=True)
+            response.raise_for_status()
+        elif isinstance(response, Exception):
+            raise response
         
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Every row from this page shares one scrape timestamp
+        scrape_date = datetime.now().isoformat()
         
-        # Try to find the data in the page
-        # First, look for JavaScript data embedded in the page
-        scripts = soup.find_all('script')
+        # Decode the body once for extracting and saving
+        html = response.text
         driver_data = []
         
-        for script in scripts:
-            script_text = script.string
-            if script_text and 'window.__INITIAL_STATE__' in script_text:
-                # Extract the JSON data
-                match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', script_text, re.DOTALL)
-                if match:
-                    json_data = match.group(1)
-                    try:
-                        data = json.loads(json_data)
-                        # Extract driver data from the JSON
-                        if 'statistics' in data and 'drivers' in data['statistics']:
-                            driver_data = data['statistics']['drivers']
-                            break
-                    except json.JSONDecodeError:
-                        continue
+        # First, look for the JavaScript state embedded in the page; it is decoded
+        # straight from the page text, so no HTML parsing is needed when present
+        if 'window.__INITIAL_STATE__' in html:
+            data = extract_initial_state(html)
+            # Extract the relevant driver fields from the JSON
+            if data and 'drivers' in data.get('statistics', {}):
+                driver_data = [
+                    {
+                        'name': driver.get('name', ''),
+                        'team': driver.get('team', ''),
+                        'price': driver.get('price', 0),
+                        'scrape_date': scrape_date
+                    }
+                    for driver in data['statistics']['drivers']
+                ]
         
         # If we couldn't find the data in the scripts, try to parse the table directly
         if not driver_data:
+            soup = BeautifulSoup(html, HTML_PARSER, parse_only=PAGE_STRAINER)
             driver_table = soup.find('table', class_=re.compile('drivers|statistics'))
             if driver_table:
                 rows = driver_table.find_all('tr')
@@ -104,65 +174,59 @@ def scrape_driver_prices():
                             'name': name,
                             'team': team,
                             'price': float(price),
-                            'scrape_date': datetime.now().isoformat()
+                            'scrape_date': scrape_date
                         })
         
         # Save the raw HTML for inspection
-        drivers_html_path = os.path.join(DATA_DIR, 'f1_fantasy_drivers_page.html')
-        with open(drivers_html_path, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        
-        # Process the driver data
-        processed_drivers = []
-        for driver in driver_data:
-            # Extract the relevant fields
-            processed_driver = {
-                'name': driver.get('name', ''),
-                'team': driver.get('team', ''),
-                'price': driver.get('price', 0),
-                'scrape_date': datetime.now().isoformat()
-            }
-            processed_drivers.append(processed_driver)
-        
-        return processed_drivers
+        if SCRAPE_SAVE_HTML:
+            with open(DRIVERS_HTML_PATH, "w", encoding="utf-8") as f:
+                f.write(html)
+        
+        return driver_data
     
     except Exception as e:
         print(f"Error scraping driver prices: {e}")
         return []
 
-def scrape_constructor_prices():
-    """Scrape constructor prices from the F1 Fantasy website."""
+def scrape_constructor_prices(response=None):
+    """Scrape constructor prices from the F1 Fantasy website.
+    
+    Args:
+        response: Already fetched constructor page (or the error fetching it); fetched if None
+    """
     try:
         # Make the HTTP request
-        response = httpx.get(CONSTRUCTOR_URL, follow_redirects=True)
-        response.raise_for_status()
+        if response is None:
+            response = httpx.get(CONSTRUCTOR_URL, follow_redirects=True)
+            response.raise_for_status()
+        elif isinstance(response, Exception):
+            raise response
         
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Every row from this page shares one scrape timestamp
+        scrape_date = datetime.now().isoformat()
         
-        # Try to find the data in the page
-        # First, look for JavaScript data embedded in the page
-        scripts = soup.find_all('script')
+        # Decode the body once for extracting and saving
+        html = response.text
         constructor_data = []
         
-        for script in scripts:
-            script_text = script.string
-            if script_text and 'window.__INITIAL_STATE__' in script_text:
-                # Extract the JSON data
-                match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', script_text, re.DOTALL)
-                if match:
-                    json_data = match.group(1)
-                    try:
-                        data = json.loads(json_data)
-                        # Extract constructor data from the JSON
-                        if 'statistics' in data and 'constructors' in data['statistics']:
-                            constructor_data = data['statistics']['constructors']
-                            break
-                    except json.JSONDecodeError:
-                        continue
+        # First, look for the JavaScript state embedded in the page; it is decoded
+        # straight from the page text, so no HTML parsing is needed when present
+        if 'window.__INITIAL_STATE__' in html:
+            data = extract_initial_state(html)
+            # Extract the relevant constructor fields from the JSON
+            if data and 'constructors' in data.get('statistics', {}):
+                constructor_data = [
+                    {
+                        'name': constructor.get('name', ''),
+                        'price': constructor.get('price', 0),
+                        'scrape_date': scrape_date
+                    }
+                    for constructor in data['statistics']['constructors']
+                ]
         
         # If we couldn't find the data in the scripts, try to parse the table directly
         if not constructor_data:
+            soup = BeautifulSoup(html, HTML_PARSER, parse_only=PAGE_STRAINER)
             constructor_table = soup.find('table', class_=re.compile('constructors|statistics'))
             if constructor_table:
                 rows = constructor_table.find_all('tr')
@@ -174,26 +238,15 @@ def scrape_constructor_prices():
                         constructor_data.append({
                             'name': name,
                             'price': float(price),
-                            'scrape_date': datetime.now().isoformat()
+                            'scrape_date': scrape_date
                         })
         
         # Save the raw HTML for inspection
-        constructors_html_path = os.path.join(DATA_DIR, 'f1_fantasy_constructors_page.html')
-        with open(constructors_html_path, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        
-        # Process the constructor data
-        processed_constructors = []
-        for constructor in constructor_data:
-            # Extract the relevant fields
-            processed_constructor = {
-                'name': constructor.get('name', ''),
-                'price': constructor.get('price', 0),
-                'scrape_date': datetime.now().isoformat()
-            }
-            processed_constructors.append(processed_constructor)
-        
-        return processed_constructors
+        if SCRAPE_SAVE_HTML:
+            with open(CONSTRUCTORS_HTML_PATH, "w", encoding="utf-8") as f:
+                f.write(html)
+        
+        return constructor_data
     
     except Exception as e:
         print(f"Error scraping constructor prices: {e}")
@@ -203,17 +256,15 @@ def save_data_to_json(drivers, constructors):
     """Save the scraped data to JSON files."""
     # Save driver data
     if drivers:
-        drivers_json_path = os.path.join(DATA_DIR, 'f1_fantasy_drivers.json')
-        with open(drivers_json_path, "w", encoding="utf-8") as f:
-            json.dump(drivers, f, indent=2)
-        print(f"Driver data saved to {drivers_json_path}")
+        with open(DRIVERS_JSON_PATH, "w", encoding="utf-8") as f:
+            f.write(json.dumps(drivers, indent=2))
+        print(f"Driver data saved to {DRIVERS_JSON_PATH}")
     
     # Save constructor data
     if constructors:
-        constructors_json_path = os.path.join(DATA_DIR, 'f1_fantasy_constructors.json')
-        with open(constructors_json_path, "w", encoding="utf-8") as f:
-            json.dump(constructors, f, indent=2)
-        print(f"Constructor data saved to {constructors_json_path}")
+        with open(CONSTRUCTORS_JSON_PATH, "w", encoding="utf-8") as f:
+            f.write(json.dumps(constructors, indent=2))
+        print(f"Constructor data saved to {CONSTRUCTORS_JSON_PATH}")
 
 if __name__ == "__main__":
     scrape_prices() 
\ No newline at end of file
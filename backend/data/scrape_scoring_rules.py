@@ -6,11 +6,13 @@ and save them to a text file.
 
 import httpx
 from bs4 import BeautifulSoup
-import json
+import importlib.util
 import os
 import re
 import pathlib
 
+from backend.utils.config import SCRAPE_SAVE_HTML
+
 # Get the project root directory
 ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
 
@@ -21,6 +23,12 @@ os.makedirs(DATA_DIR, exist_ok=True)
 # URL of the F1 Fantasy game rules
 URL = "https://fantasy.formula1.com/en/game-rules"
 
+# Class names of the page elements that may hold the scoring rules
+SCORING_SECTION_CLASS_RE = re.compile('scoring|points|rules|content')
+
+# Use the C-backed lxml parser when it is installed, falling back to the stdlib one
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
 # Define the scoring rules manually based on the F1 Fantasy website
 # This is a fallback in case the scraping doesn't work
 F1_FANTASY_SCORING_RULES = """
@@ -92,13 +100,16 @@ def scrape_scoring_rules():
         response = httpx.get(URL, follow_redirects=True)
         response.raise_for_status()
         
+        # Decode the page once; the parser and the optional HTML dump share it
+        html = response.text
+        
         # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(html, HTML_PARSER)
         
         # Try to find scoring rules sections
         # This is a best effort attempt as the structure may change
         scoring_sections = soup.find_all(['div', 'section', 'article'], 
-                                        class_=re.compile('scoring|points|rules|content'))
+                                        class_=SCORING_SECTION_CLASS_RE)
         
         # If we can't find the scoring sections, use our predefined rules
         if not scoring_sections:
@@ -115,9 +126,10 @@ def scrape_scoring_rules():
             scoring_rules = "\n\n".join(scoring_rules)
         
         # Save the raw HTML for inspection
-        html_file_path = os.path.join(DATA_DIR, 'f1_fantasy_rules_full.html')
-        with open(html_file_path, "w", encoding="utf-8") as f:
-            f.write(response.text)
+        if SCRAPE_SAVE_HTML:
+            html_file_path = os.path.join(DATA_DIR, 'f1_fantasy_rules_full.html')
+            with open(html_file_path, "w", encoding="utf-8") as f:
+                f.write(html)
         
         # Save the scoring rules to a text file
         rules_file_path = os.path.join(DATA_DIR, 'f1_fantasy_scoring_rules.txt')
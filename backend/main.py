@@ -7,7 +7,7 @@ from typing import List
 
 import uvicorn
 
-from backend.utils.config import API_DEBUG, API_HOST, API_PORT
+from backend.utils.config import API_DEBUG, API_HOST, API_PORT, API_WORKERS
 from backend.utils.logging import setup_logging
 
 
@@ -30,6 +30,12 @@ def parse_args(args: List[str]) -> argparse.Namespace:
     parser.add_argument(
         "--debug", action="store_true", default=API_DEBUG, help="Enable debug mode"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=API_WORKERS,
+        help="Number of worker processes (ignored in debug mode, which reloads on change)",
+    )
     parser.add_argument(
         "--log-level",
         type=str,
@@ -54,12 +60,14 @@ def main() -> None:
     logger = logging.getLogger(__name__)
     logger.info(f"Starting F1 Fantasy Analysis API on {args.host}:{args.port}")
     
-    # Run the API server
+    # Run the API server; uvicorn picks uvloop and httptools automatically when
+    # they are installed, and auto-reload only works with a single process
     uvicorn.run(
         "backend.api.app:app",
         host=args.host,
         port=args.port,
         reload=args.debug,
+        workers=1 if args.debug else args.workers,
         log_level=args.log_level.lower(),
     )
 
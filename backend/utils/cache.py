@@ -0,0 +1,154 @@
+"""Caching utilities for F1 Fantasy Analysis."""
+
+import copy
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Tuple
+
+from fastapi import Response
+
+from backend.utils.config import CACHE_ENABLED, CACHE_MAX_SIZE, CACHE_TTL
+
+# Returned by _TTLCache.get for missing or expired keys
+_MISSING = object()
+
+
+class _TTLCache:
+    """Least-recently-used cache whose entries also expire after a time to live."""
+
+    def __init__(self, max_size: int):
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of entries kept; the least recently used go first
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of entries, including any expired ones not yet purged."""
+        return len(self._entries)
+
+    def get(self, key: Hashable, now: float) -> Any:
+        """Return the live value under a key, or _MISSING if it is absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= now:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, expiry: float, now: float) -> None:
+        """Store a value, dropping expired entries and then the least recently used."""
+        expired = [k for k, (entry_expiry, _) in self._entries.items() if entry_expiry <= now]
+        for k in expired:
+            del self._entries[k]
+        self._entries[key] = (expiry, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+
+
+# Cached endpoint results keyed by (function name, arguments)
+_response_cache = _TTLCache(CACHE_MAX_SIZE)
+
+# Cached intermediate values (e.g. DataFrames) shared across endpoints
+_value_cache = _TTLCache(CACHE_MAX_SIZE)
+
+
+def _copy(value: Any) -> Any:
+    """Copy a cached value so callers cannot modify the cached one.
+
+    Args:
+        value: Value to copy
+
+    Returns:
+        An independent copy; DataFrames are cloned without copying their data
+    """
+    if isinstance(value, Response):
+        # The body is immutable bytes; only the header list needs its own copy
+        response = Response(
+            content=value.body, status_code=value.status_code, background=value.background
+        )
+        response.raw_headers = list(value.raw_headers)
+        return response
+    return copy.deepcopy(value)
+
+
+def cached_response(
+    ttl: int = CACHE_TTL, exclude: Iterable[str] = ("fetcher",)
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache the result of an async endpoint in-process for a fixed time.
+
+    Results are keyed on the endpoint name and its keyword arguments, so different
+    query parameters are cached separately. Exceptions are never cached, and every
+    caller gets its own copy of the result.
+
+    Args:
+        ttl: Time to live for cached results, in seconds
+        exclude: Keyword arguments to leave out of the cache key (e.g. dependencies)
+
+    Returns:
+        Decorator for an async endpoint function
+    """
+    excluded = frozenset(exclude)
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            key = (
+                func.__qualname__,
+                tuple(sorted((k, v) for k, v in kwargs.items() if k not in excluded)),
+            )
+            now = time.monotonic()
+            cached = _response_cache.get(key, now)
+            if cached is not _MISSING:
+                return _copy(cached)
+
+            result = await func(*args, **kwargs)
+            _response_cache.set(key, _copy(result), now + ttl, now)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def cached_value(key: Hashable, build: Callable[[], Any], ttl: int = CACHE_TTL) -> Any:
+    """Return a copy of the value cached under a key, building it if missing or expired.
+
+    Args:
+        key: Hashable description of the inputs the value is built from
+        build: Function that builds the value
+        ttl: Time to live for the cached value, in seconds
+
+    Returns:
+        The cached or newly built value
+    """
+    if not CACHE_ENABLED:
+        return build()
+
+    now = time.monotonic()
+    cached = _value_cache.get(key, now)
+    if cached is not _MISSING:
+        return _copy(cached)
+
+    value = build()
+    _value_cache.set(key, _copy(value), now + ttl, now)
+    return value
+
+
+def clear_response_cache() -> None:
+    """Remove all cached endpoint results and intermediate values."""
+    _response_cache.clear()
+    _value_cache.clear()
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
 from dotenv import load_dotenv
 
@@ -20,10 +20,18 @@ DATA_DIR.mkdir(exist_ok=True)
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
 API_DEBUG = os.getenv("API_DEBUG", "False").lower() in ("true", "1", "t")
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# CORS configuration (comma-separated origins; browsers cache preflights for CORS_MAX_AGE seconds)
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",")]
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "86400"))  # 1 day in seconds
 
 # External API configuration
 ERGAST_API_URL = os.getenv("ERGAST_API_URL", "https://ergast.com/api/f1")
 
+# Scraper configuration (raw pages are only written to data/ for inspection when enabled)
+SCRAPE_SAVE_HTML = os.getenv("SCRAPE_SAVE_HTML", "False").lower() in ("true", "1", "t")
+
 # Database configuration (for future use)
 DB_URL = os.getenv("DB_URL", "")
 
@@ -34,6 +42,7 @@ MAX_DRIVERS = int(os.getenv("MAX_DRIVERS", "5"))
 # Cache settings
 CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() in ("true", "1", "t")
 CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour in seconds
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "256"))  # entries per cache
 
 
 def get_config() -> Dict[str, Any]:
@@ -47,10 +56,16 @@ def get_config() -> Dict[str, Any]:
             "host": API_HOST,
             "port": API_PORT,
             "debug": API_DEBUG,
+            "workers": API_WORKERS,
+            "cors_origins": CORS_ORIGINS,
+            "cors_max_age": CORS_MAX_AGE,
         },
         "external_api": {
             "ergast_url": ERGAST_API_URL,
         },
+        "scraper": {
+            "save_html": SCRAPE_SAVE_HTML,
+        },
         "database": {
             "url": DB_URL,
         },
@@ -61,5 +76,6 @@ def get_config() -> Dict[str, Any]:
         "cache": {
             "enabled": CACHE_ENABLED,
             "ttl": CACHE_TTL,
+            "max_size": CACHE_MAX_SIZE,
         },
     } 
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.app import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create one test client whose application lifespan spans the whole session."""
+    with TestClient(app) as test_client:
+        yield test_client
@@ -3,12 +3,15 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.api import routes
 from backend.api.app import app
+from backend.api.routes import get_data_fetcher, get_driver_dataframe
+from backend.data.models import Driver
+from backend.utils.cache import clear_response_cache
+from backend.utils.config import CORS_MAX_AGE
 
-client = TestClient(app)
 
-
-def test_root_endpoint():
+def test_root_endpoint(client):
     """Test the root endpoint."""
     response = client.get("/")
     assert response.status_code == 200
@@ -17,7 +20,7 @@ def test_root_endpoint():
     assert data["status"] == "online"
 
 
-def test_health_check():
+def test_health_check(client):
     """Test the health check endpoint."""
     response = client.get("/health")
     assert response.status_code == 200
@@ -30,7 +33,7 @@ def test_health_check():
 # This is just a placeholder for demonstration purposes.
 
 @pytest.mark.skip(reason="Requires mocking F1DataFetcher")
-def test_get_races():
+def test_get_races(client):
     """Test the get_races endpoint."""
     response = client.get("/api/v1/races")
     assert response.status_code == 200
@@ -39,7 +42,7 @@ def test_get_races():
 
 
 @pytest.mark.skip(reason="Requires mocking F1DataFetcher")
-def test_get_drivers():
+def test_get_drivers(client):
     """Test the get_drivers endpoint."""
     response = client.get("/api/v1/drivers")
     assert response.status_code == 200
@@ -48,7 +51,7 @@ def test_get_drivers():
 
 
 @pytest.mark.skip(reason="Requires mocking F1DataFetcher")
-def test_get_teams():
+def test_get_teams(client):
     """Test the get_teams endpoint."""
     response = client.get("/api/v1/teams")
     assert response.status_code == 200
@@ -57,7 +60,7 @@ def test_get_teams():
 
 
 @pytest.mark.skip(reason="Requires mocking F1DataFetcher")
-def test_get_driver_value_analysis():
+def test_get_driver_value_analysis(client):
     """Test the get_driver_value_analysis endpoint."""
     response = client.get("/api/v1/analysis/driver-value")
     assert response.status_code == 200
@@ -66,11 +69,118 @@ def test_get_driver_value_analysis():
 
 
 @pytest.mark.skip(reason="Requires mocking F1DataFetcher")
-def test_get_optimal_team():
+def test_get_optimal_team(client):
     """Test the get_optimal_team endpoint."""
     response = client.get("/api/v1/analysis/optimal-team")
     assert response.status_code == 200
     data = response.json()
     assert "drivers" in data
     assert "team" in data
-    assert "remaining_budget" in data 
\ No newline at end of file
+    assert "remaining_budget" in data 
+
+class CountingFetcher:
+    """Stub fetcher returning fixed drivers and counting upstream calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_drivers(self):
+        self.calls += 1
+        return [
+            Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=30.5, points=250.0),
+            Driver(id=2, name="Oliver Bearman", team="Haas", price=5.5, points=30.0),
+        ]
+
+
+def test_analysis_responses_are_cached(client):
+    """Test that repeated analysis requests are served from the response cache."""
+    fetcher = CountingFetcher()
+    app.dependency_overrides[get_data_fetcher] = lambda: fetcher
+    clear_response_cache()
+    try:
+        first = client.get("/api/v1/analysis/driver-value")
+        second = client.get("/api/v1/analysis/driver-value")
+    finally:
+        app.dependency_overrides.clear()
+        clear_response_cache()
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()[0]["driver"]["name"] == "Max Verstappen"
+    assert fetcher.calls == 1
+
+
+def test_analysis_frames_are_returned_as_json_rows(client):
+    """Test that DataFrame endpoints return one JSON object per row."""
+    app.dependency_overrides[get_data_fetcher] = lambda: CountingFetcher()
+    clear_response_cache()
+    try:
+        response = client.get("/api/v1/analysis/team-performance")
+    finally:
+        app.dependency_overrides.clear()
+        clear_response_cache()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert [row["team"] for row in response.json()] == ["Red Bull Racing", "Haas"]
+    assert response.json()[0]["avg_form"] is None
+
+
+def test_driver_dataframe_is_shared_across_requests(monkeypatch):
+    """Test that identical driver data reuses one DataFrame and changed data rebuilds it."""
+    build = routes.create_driver_dataframe
+    builds = []
+
+    def counting_build(drivers):
+        builds.append(drivers)
+        return build(drivers)
+
+    monkeypatch.setattr(routes, "create_driver_dataframe", counting_build)
+
+    def make_drivers():
+        return [
+            Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=30.5, points=250.0),
+            Driver(id=2, name="Oliver Bearman", team="Haas", price=5.5, points=30.0),
+        ]
+
+    clear_response_cache()
+    try:
+        first = get_driver_dataframe(make_drivers())
+        second = get_driver_dataframe(make_drivers())
+        changed = make_drivers()
+        changed[0].points = 260.0
+        third = get_driver_dataframe(changed)
+    finally:
+        clear_response_cache()
+
+    assert len(builds) == 2
+    assert second is not first
+    assert second.equals(first)
+    assert third[0, "points"] == 260.0
+
+
+def test_lifespan_shares_one_fetcher(monkeypatch):
+    """Test that the application opens one shared fetcher at startup and closes it at shutdown."""
+    # Run a fresh lifespan without closing the session client's shared fetcher
+    monkeypatch.setattr(routes, "_shared_fetcher", None)
+    with TestClient(app):
+        fetcher = routes._shared_fetcher
+        assert fetcher is not None
+        assert not fetcher.client.is_closed
+
+    assert routes._shared_fetcher is None
+    assert fetcher.client.is_closed
+
+
+def test_cors_preflight_is_cacheable(client):
+    """Test that CORS preflight responses allow the frontend's request and set max-age."""
+    response = client.options(
+        "/api/v1/analysis/driver-value",
+        headers={
+            "Origin": "http://localhost:3000",
+            "Access-Control-Request-Method": "GET",
+            "Access-Control-Request-Headers": "content-type",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-max-age"] == str(CORS_MAX_AGE)
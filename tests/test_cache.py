@@ -0,0 +1,100 @@
+"""Tests for the caching utilities."""
+
+import asyncio
+
+import polars as pl
+from fastapi import Response
+
+from backend.utils import cache
+from backend.utils.cache import cached_response, cached_value, clear_response_cache
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache keeps at most max_size entries, dropping the least recently used."""
+    entries = cache._TTLCache(max_size=2)
+    entries.set("a", 1, expiry=100.0, now=0.0)
+    entries.set("b", 2, expiry=100.0, now=0.0)
+    assert entries.get("a", now=1.0) == 1
+
+    entries.set("c", 3, expiry=100.0, now=1.0)
+    assert len(entries) == 2
+    assert entries.get("b", now=1.0) is cache._MISSING
+    assert entries.get("a", now=1.0) == 1
+    assert entries.get("c", now=1.0) == 3
+
+
+def test_cache_purges_expired_entries_on_insert():
+    """Test that expired entries are dropped when a new one is stored."""
+    entries = cache._TTLCache(max_size=10)
+    entries.set("a", 1, expiry=5.0, now=0.0)
+    entries.set("b", 2, expiry=50.0, now=0.0)
+
+    entries.set("c", 3, expiry=60.0, now=10.0)
+    assert len(entries) == 2
+    assert entries.get("a", now=10.0) is cache._MISSING
+    assert entries.get("b", now=10.0) == 2
+
+
+def test_cached_response_returns_copies():
+    """Test that callers cannot modify a cached endpoint result."""
+    calls = []
+
+    @cached_response()
+    async def endpoint(limit: int = 2):
+        calls.append(limit)
+        return [{"name": "Max Verstappen"}]
+
+    clear_response_cache()
+    try:
+        first = asyncio.run(endpoint(limit=2))
+        first[0]["name"] = "changed"
+        first.append({"name": "extra"})
+        second = asyncio.run(endpoint(limit=2))
+        second.clear()
+        third = asyncio.run(endpoint(limit=2))
+    finally:
+        clear_response_cache()
+
+    assert calls == [2]
+    assert third == [{"name": "Max Verstappen"}]
+
+
+def test_cached_response_copies_responses():
+    """Test that cached Response objects are handed out as independent copies."""
+
+    @cached_response()
+    async def endpoint():
+        return Response(content=b"[]", media_type="application/json")
+
+    clear_response_cache()
+    try:
+        first = asyncio.run(endpoint())
+        first.headers["x-extra"] = "1"
+        second = asyncio.run(endpoint())
+    finally:
+        clear_response_cache()
+
+    assert second is not first
+    assert second.body == b"[]"
+    assert second.headers["content-type"] == "application/json"
+    assert "x-extra" not in second.headers
+
+
+def test_cached_value_returns_copies():
+    """Test that cached DataFrames are returned as clones built only once."""
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pl.DataFrame({"points": [1.0, 2.0]})
+
+    clear_response_cache()
+    try:
+        first = cached_value("frame", build)
+        second = cached_value("frame", build)
+    finally:
+        clear_response_cache()
+
+    assert builds == [1]
+    assert second is not first
+    assert second.equals(first)
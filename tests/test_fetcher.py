@@ -0,0 +1,106 @@
+"""Tests for the F1 data fetcher."""
+
+import asyncio
+
+import httpx
+
+from backend.data.fetcher import F1DataFetcher
+
+DRIVERS_PAYLOAD = {
+    "MRData": {
+        "DriverTable": {
+            "Drivers": [
+                {"givenName": "Max", "familyName": "Verstappen"},
+                {"givenName": "Oliver", "familyName": "Bearman"},
+            ]
+        }
+    }
+}
+
+
+def make_fetcher(handler):
+    """Create a fetcher whose HTTP client is served by a mock transport."""
+    return F1DataFetcher(
+        base_url="https://example.test/api/f1", transport=httpx.MockTransport(handler)
+    )
+
+
+def test_upstream_results_are_cached():
+    """Test that repeated calls reuse the first upstream response until cleared."""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(200, json=DRIVERS_PAYLOAD)
+
+    async def run():
+        fetcher = make_fetcher(handler)
+        try:
+            first = await fetcher.get_drivers()
+            first.clear()
+            second = await fetcher.get_drivers()
+            fetcher.clear_cache()
+            third = await fetcher.get_drivers()
+        finally:
+            await fetcher.close()
+        return second, third
+
+    second, third = asyncio.run(run())
+
+    assert [d.name for d in second] == ["Max Verstappen", "Oliver Bearman"]
+    assert len(third) == 2
+    assert requests == ["/api/f1/current/drivers.json"] * 2
+
+
+def test_cached_models_are_copied():
+    """Test that modifying a returned driver does not change the cached one."""
+
+    async def run():
+        fetcher = make_fetcher(lambda request: httpx.Response(200, json=DRIVERS_PAYLOAD))
+        try:
+            first = await fetcher.get_drivers()
+            first[0].price = 99.0
+            first[0].race_history.append(25.0)
+            return await fetcher.get_drivers()
+        finally:
+            await fetcher.close()
+
+    second = asyncio.run(run())
+
+    assert second[0].price == 10.0
+    assert second[0].race_history == []
+
+
+def test_failed_fetches_are_not_cached():
+    """Test that an upstream error is retried on the next call rather than cached."""
+    responses = [httpx.Response(500), httpx.Response(200, json=DRIVERS_PAYLOAD)]
+
+    async def run():
+        fetcher = make_fetcher(lambda request: responses.pop(0))
+        try:
+            return await fetcher.get_drivers(), await fetcher.get_drivers()
+        finally:
+            await fetcher.close()
+
+    failed, retried = asyncio.run(run())
+
+    assert failed == []
+    assert len(retried) == 2
+
+
+def test_mock_driver_fields():
+    """Test that fetched drivers carry the expected mock fields."""
+
+    async def run():
+        fetcher = make_fetcher(lambda request: httpx.Response(200, json=DRIVERS_PAYLOAD))
+        try:
+            return await fetcher.get_drivers()
+        finally:
+            await fetcher.close()
+
+    drivers = asyncio.run(run())
+
+    assert [d.price for d in drivers] == [10.0, 11.5]
+    assert drivers[1].points == 10.0
+    assert drivers[1].value == 10.0 / 11.5
+    assert drivers[0].race_history == []
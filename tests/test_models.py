@@ -2,14 +2,16 @@
 
 from datetime import datetime
 
+import numpy as np
 import pytest
 
 from backend.data.models import Driver, FantasyTeam, Race, Team
 
 
-def test_driver_model():
-    """Test the Driver model."""
-    driver = Driver(
+@pytest.fixture(scope="module")
+def sample_driver():
+    """Create a driver shared by the tests that only read it."""
+    return Driver(
         id=1,
         name="Max Verstappen",
         team="Red Bull Racing",
@@ -18,6 +20,24 @@ def test_driver_model():
         form=4.5,
         race_history=[25.0, 18.0, 25.0, 25.0, 15.0],
     )
+
+
+@pytest.fixture(scope="module")
+def sample_team():
+    """Create a team shared by the tests that only read it."""
+    return Team(
+        id=1,
+        name="Red Bull Racing",
+        price=25.5,
+        points=450.0,
+        form=4.8,
+        race_history=[43.0, 35.0, 44.0, 40.0, 30.0],
+    )
+
+
+def test_driver_model(sample_driver):
+    """Test the Driver model."""
+    driver = sample_driver
     
     assert driver.id == 1
     assert driver.name == "Max Verstappen"
@@ -28,16 +48,44 @@ def test_driver_model():
     assert driver.race_history == [25.0, 18.0, 25.0, 25.0, 15.0]
 
 
-def test_team_model():
+def test_driver_value():
+    """Test that the driver value follows changes to price and points."""
+    driver = Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=25.0, points=250.0)
+
+    assert driver.value == 10.0
+    assert "value" not in driver.model_dump()
+
+    driver.price = 50.0
+    assert driver.value == 5.0
+
+    driver.points = 0.0
+    assert driver.value == 0.0
+
+    assert Driver(id=2, name="Free Driver", team="Haas", price=0.0, points=10.0).value == 0.0
+    assert driver.model_copy(update={"points": 100.0}).value == 2.0
+
+
+def test_driver_race_history_array():
+    """Test that the race history array tracks reassignment and in-place edits."""
+    driver = Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=30.5)
+    driver.race_history = [25.0, 18.0]
+
+    assert driver.race_history_array.dtype == np.float32
+    assert driver.race_history_array.tolist() == [25.0, 18.0]
+
+    driver.race_history = [15.0]
+    assert driver.race_history_array.tolist() == [15.0]
+
+    driver.race_history.append(10.0)
+    assert driver.race_history_array.tolist() == [15.0, 10.0]
+
+    copy = driver.model_copy(update={"race_history": [1.0]})
+    assert copy.race_history_array.tolist() == [1.0]
+
+
+def test_team_model(sample_team):
     """Test the Team model."""
-    team = Team(
-        id=1,
-        name="Red Bull Racing",
-        price=25.5,
-        points=450.0,
-        form=4.8,
-        race_history=[43.0, 35.0, 44.0, 40.0, 30.0],
-    )
+    team = sample_team
     
     assert team.id == 1
     assert team.name == "Red Bull Racing"
@@ -67,19 +115,17 @@ def test_race_model():
     assert race.completed is True
 
 
-def test_fantasy_team_model():
+def test_fantasy_team_model(sample_driver, sample_team):
     """Test the FantasyTeam model."""
-    driver1 = Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=30.5)
     driver2 = Driver(id=2, name="Lewis Hamilton", team="Mercedes", price=28.5)
-    team = Team(id=1, name="Red Bull Racing", price=25.5)
     
     fantasy_team = FantasyTeam(
         id=1,
         name="My Fantasy Team",
         budget=100.0,
         total_points=350.0,
-        drivers=[driver1, driver2],
-        constructor=team,
+        drivers=[sample_driver, driver2],
+        constructor=sample_team,
     )
     
     assert fantasy_team.id == 1
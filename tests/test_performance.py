@@ -0,0 +1,269 @@
+"""Tests for the performance analysis module."""
+
+import math
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from backend.analysis import performance
+from backend.analysis.performance import (
+    analyze_form_trends,
+    optimal_team_selection,
+    price_scale,
+    rank_drivers_by_value,
+    rank_teams_by_value,
+)
+from backend.data.models import Driver, Team
+
+
+@pytest.fixture
+def sample_drivers():
+    """Create sample drivers where greedy value selection is not optimal."""
+    return [
+        Driver(id=1, name="Max Verstappen", team="Red Bull Racing", price=30.5, points=250.0),
+        Driver(id=2, name="Lewis Hamilton", team="Ferrari", price=28.0, points=200.0),
+        Driver(id=3, name="Charles Leclerc", team="Ferrari", price=25.5, points=190.0),
+        Driver(id=4, name="Lando Norris", team="McLaren", price=24.0, points=185.0),
+        Driver(id=5, name="Oscar Piastri", team="McLaren", price=21.5, points=150.0),
+        Driver(id=6, name="Pierre Gasly", team="Alpine", price=11.5, points=95.0),
+        Driver(id=7, name="Yuki Tsunoda", team="RB", price=9.0, points=70.0),
+        Driver(id=8, name="Oliver Bearman", team="Haas", price=5.5, points=30.0),
+    ]
+
+
+@pytest.fixture
+def sample_teams():
+    """Create sample teams for testing."""
+    return [
+        Team(id=1, name="Red Bull Racing", price=26.0, points=300.0),
+        Team(id=2, name="McLaren", price=24.0, points=320.0),
+        Team(id=3, name="Haas", price=8.0, points=60.0),
+    ]
+
+
+def test_rank_drivers_by_value(sample_drivers):
+    """Test that drivers are ranked by points per million."""
+    ranked = rank_drivers_by_value(sample_drivers)
+
+    values = [value for _, value in ranked]
+    assert values == sorted(values, reverse=True)
+    assert ranked[0][0].name == "Pierre Gasly"
+    assert ranked[0][1] == pytest.approx(95.0 / 11.5)
+
+
+def test_rank_teams_by_value_zero_price():
+    """Test that teams with a non-positive price get zero value and rank last."""
+    teams = [
+        Team(id=1, name="Red Bull Racing", price=0.0, points=300.0),
+        Team(id=2, name="McLaren", price=24.0, points=320.0),
+    ]
+
+    ranked = rank_teams_by_value(teams)
+
+    assert [team.id for team, _ in ranked] == [2, 1]
+    assert ranked[1][1] == 0.0
+
+
+def test_analyze_form_trends():
+    """Test that form trends are the least-squares slope of the last 3 races."""
+    drivers = [
+        Driver(
+            id=1,
+            name="Max Verstappen",
+            team="Red Bull Racing",
+            price=30.5,
+            race_history=[25.0, 18.0, 25.0, 25.0, 15.0],
+        ),
+        Driver(id=2, name="Lewis Hamilton", team="Ferrari", price=28.0, race_history=[12.0, 18.0]),
+        Driver(id=3, name="Oliver Bearman", team="Haas", price=5.5, race_history=[4.0]),
+        Driver(id=4, name="Lando Norris", team="McLaren", price=24.0),
+    ]
+
+    trends = analyze_form_trends(drivers)
+
+    assert list(trends) == ["Max Verstappen", "Lewis Hamilton", "Oliver Bearman", "Lando Norris"]
+    assert trends["Max Verstappen"] == pytest.approx(-5.0)
+    assert trends["Lewis Hamilton"] == pytest.approx(6.0)
+    assert trends["Oliver Bearman"] == 0.0
+    assert trends["Lando Norris"] == 0.0
+
+
+def brute_force_best(drivers, teams, budget, max_drivers):
+    """Exhaustively search every team and driver subset for the best total points."""
+    best = 0.0
+    for team in teams:
+        for k in range(max_drivers + 1):
+            for combo in combinations(drivers, k):
+                cost = team.price + sum(d.price for d in combo)
+                if cost <= budget + 1e-9:
+                    best = max(best, team.points + sum(d.points for d in combo))
+    return best
+
+
+def test_optimal_team_selection_matches_brute_force(sample_drivers, sample_teams):
+    """Test that the knapsack selection finds the exhaustive optimum."""
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        sample_drivers, sample_teams, budget=100.0, max_drivers=3
+    )
+
+    total_points = selected_team.points + sum(d.points for d in selected_drivers)
+    assert total_points == pytest.approx(brute_force_best(sample_drivers, sample_teams, 100.0, 3))
+    assert len(selected_drivers) <= 3
+    assert remaining_budget >= 0
+
+
+def test_optimal_team_selection_approximate_fallback(sample_drivers, sample_teams, monkeypatch):
+    """Test the enumerated greedy fallback used when the knapsack table is too large."""
+    monkeypatch.setattr(performance, "MAX_DP_CELLS", 0)
+
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        sample_drivers, sample_teams, budget=100.0, max_drivers=3
+    )
+
+    total_points = selected_team.points + sum(d.points for d in selected_drivers)
+    optimum = brute_force_best(sample_drivers, sample_teams, 100.0, 3)
+    assert (1 - 1 / math.e) * optimum <= total_points <= optimum
+    total_cost = selected_team.price + sum(d.price for d in selected_drivers)
+    assert total_cost + remaining_budget == pytest.approx(100.0)
+    assert remaining_budget >= 0
+
+
+def test_optimal_team_selection_approximate_fallback_scales(monkeypatch):
+    """Test that the approximate fallback does bounded work and stays near the optimum."""
+    rng = np.random.default_rng(0)
+    drivers = [
+        Driver(
+            id=i,
+            name=f"Driver {i}",
+            team="Unknown",
+            price=float(np.round(rng.uniform(5.0, 30.0), 1)),
+            points=float(rng.uniform(0.0, 300.0)),
+        )
+        for i in range(1000)
+    ]
+    teams = [
+        Team(
+            id=i,
+            name=f"Team {i}",
+            price=float(np.round(rng.uniform(5.0, 30.0), 1)),
+            points=float(rng.uniform(0.0, 300.0)),
+        )
+        for i in range(10)
+    ]
+    exact_drivers, exact_team, _ = optimal_team_selection(drivers, teams, budget=100.0)
+    optimum = exact_team.points + sum(d.points for d in exact_drivers)
+
+    monkeypatch.setattr(performance, "MAX_DP_CELLS", 0)
+    greedy_extend = performance._greedy_extend
+    calls = []
+
+    def counting_extend(*args, **kwargs):
+        calls.append(args)
+        return greedy_extend(*args, **kwargs)
+
+    monkeypatch.setattr(performance, "_greedy_extend", counting_extend)
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        drivers, teams, budget=100.0
+    )
+
+    total_points = selected_team.points + sum(d.points for d in selected_drivers)
+    assert (1 - 1 / math.e) * optimum <= total_points <= optimum + 1e-9
+    assert remaining_budget >= -1e-9
+    # Per constructor: three greedy rules plus one run per seed and per seed pair,
+    # independent of the 1000 drivers
+    seeds = 2 * performance.MAX_SEED_DRIVERS
+    assert len(calls) <= len(teams) * (3 + seeds + seeds * (seeds - 1) // 2)
+
+
+def test_optimal_team_selection_budget_accounting(sample_drivers, sample_teams):
+    """Test that the remaining budget reflects the selected team and drivers."""
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        sample_drivers, sample_teams, budget=60.0, max_drivers=2
+    )
+
+    total_cost = selected_team.price + sum(d.price for d in selected_drivers)
+    assert total_cost + remaining_budget == pytest.approx(60.0)
+
+
+def test_optimal_team_selection_without_teams(sample_drivers):
+    """Test that drivers are still selected when no teams are available."""
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        sample_drivers, [], budget=20.0, max_drivers=5
+    )
+
+    assert selected_team is None
+    assert [d.id for d in selected_drivers] == [6, 8]
+    assert remaining_budget == pytest.approx(3.0)
+
+
+def test_optimal_team_selection_two_decimal_prices():
+    """Test that prices finer than one decimal place never push the team over budget."""
+    drivers = [
+        Driver(id=1, name="Pierre Gasly", team="Alpine", price=10.25, points=100.0),
+        Driver(id=2, name="Yuki Tsunoda", team="RB", price=10.2, points=90.0),
+        Driver(id=3, name="Oliver Bearman", team="Haas", price=10.15, points=50.0),
+    ]
+
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        drivers, [], budget=20.4, max_drivers=2
+    )
+
+    assert selected_team is None
+    assert [d.id for d in selected_drivers] == [1, 3]
+    assert remaining_budget == pytest.approx(0.0)
+    assert price_scale([10.25, 10.2]) == 100
+
+
+def test_greedy_by_lagrangian_fits_budget(sample_drivers):
+    """Test that the Lagrangian greedy rule respects budget and slot limits."""
+    _, prices, points, _ = performance._drivers_to_soa(sample_drivers)
+
+    for budget in (10.0, 40.0, 75.0, 200.0):
+        selected = performance._greedy_by_lagrangian(prices, points, budget, 3)
+        assert len(selected) <= 3
+        assert len(set(selected)) == len(selected)
+        assert prices[selected].sum() <= budget + 1e-9
+
+    # With room for everyone the rule simply takes the highest scorers
+    assert sorted(performance._greedy_by_lagrangian(prices, points, 200.0, 3)) == [0, 1, 2]
+
+
+def test_optimal_team_selection_prunes_unreachable_budget(
+    sample_drivers, sample_teams, monkeypatch
+):
+    """Test that the knapsack table only spans the budget left after the cheapest team."""
+    # Full table is 8 * 4 * 1001 cells; excluding the cheapest team's 80 steps fits
+    monkeypatch.setattr(performance, "MAX_DP_CELLS", 30_000)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("approximate selection should not be used")
+
+    monkeypatch.setattr(performance, "_approximate_team_selection", fail)
+
+    selected_drivers, selected_team, _ = optimal_team_selection(
+        sample_drivers, sample_teams, budget=100.0, max_drivers=3
+    )
+
+    total_points = selected_team.points + sum(d.points for d in selected_drivers)
+    assert total_points == pytest.approx(brute_force_best(sample_drivers, sample_teams, 100.0, 3))
+
+
+def test_optimal_team_selection_skips_search_when_unconstrained(
+    sample_drivers, sample_teams, monkeypatch
+):
+    """Test that an affordable budget-free optimum is returned without any search."""
+    monkeypatch.setattr(performance, "MAX_DP_CELLS", 0)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("approximate selection should not be used")
+
+    monkeypatch.setattr(performance, "_approximate_team_selection", fail)
+
+    selected_drivers, selected_team, remaining_budget = optimal_team_selection(
+        sample_drivers, sample_teams, budget=200.0, max_drivers=3
+    )
+
+    assert [d.id for d in selected_drivers] == [1, 2, 3]
+    assert selected_team.id == 2
+    assert remaining_budget == pytest.approx(200.0 - 24.0 - 30.5 - 28.0 - 25.5)
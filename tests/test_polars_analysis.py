@@ -1,8 +1,14 @@
 """Tests for the Polars analysis module."""
 
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
 import polars as pl
 import pytest
+from polars.testing import assert_frame_equal
 
+from backend.analysis import polars_analysis
 from backend.analysis.polars_analysis import (
     analyze_price_to_points_correlation,
     analyze_team_performance,
@@ -15,7 +21,7 @@ from backend.analysis.polars_analysis import (
 from backend.data.models import Driver, Team
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_drivers():
     """Create sample drivers for testing."""
     return [
@@ -67,7 +73,7 @@ def sample_drivers():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_teams():
     """Create sample teams for testing."""
     return [
@@ -98,13 +104,26 @@ def sample_teams():
     ]
 
 
+@pytest.fixture(scope="session")
+def sample_drivers_df(sample_drivers):
+    """Build the sample drivers DataFrame once; the tests only read it."""
+    return create_driver_dataframe(sample_drivers)
+
+
+@pytest.fixture(scope="session")
+def sample_teams_df(sample_teams):
+    """Build the sample teams DataFrame once; the tests only read it."""
+    return create_team_dataframe(sample_teams)
+
+
 def test_create_driver_dataframe(sample_drivers):
     """Test creating a Polars DataFrame from Driver objects."""
     df = create_driver_dataframe(sample_drivers)
     
     assert isinstance(df, pl.DataFrame)
     assert df.shape == (5, 7)  # 5 rows, 7 columns
-    assert df.columns == ["id", "name", "team", "price", "points", "form", "race_history"]
+    assert df.columns == ["id", "name", "team", "price", "points", "form", "value"]
+    assert df["value"].to_list() == pytest.approx([d.value for d in sample_drivers])
     assert df["name"].to_list() == [
         "Max Verstappen", "Lewis Hamilton", "Charles Leclerc", "Sergio Perez", "Carlos Sainz"
     ]
@@ -116,13 +135,36 @@ def test_create_team_dataframe(sample_teams):
     
     assert isinstance(df, pl.DataFrame)
     assert df.shape == (3, 6)  # 3 rows, 6 columns
-    assert df.columns == ["id", "name", "price", "points", "form", "race_history"]
+    assert df.columns == ["id", "name", "price", "points", "form", "value"]
     assert df["name"].to_list() == ["Red Bull Racing", "Mercedes", "Ferrari"]
 
 
-def test_analyze_team_performance(sample_drivers):
+def test_create_driver_dataframe_with_history(sample_drivers):
+    """Test that race history is only included when asked for."""
+    df = create_driver_dataframe(sample_drivers, include_history=True)
+    
+    assert df.columns == ["id", "name", "team", "price", "points", "form", "race_history", "value"]
+    assert df.schema["race_history"] == pl.List(pl.Float64)
+    assert df[0, "race_history"].to_list() == sample_drivers[0].race_history
+
+
+def test_missing_form_is_null():
+    """Test that a driver without form gets a null form and the neutral form factor."""
+    drivers = [Driver(id=1, name="Oliver Bearman", team="Haas", price=5.5, points=10.0)]
+    df = create_driver_dataframe(drivers)
+    
+    assert df.schema["form"] == pl.Float64
+    assert df["form"].to_list() == [None]
+    
+    prediction_df = predict_future_points(df, races_completed=5, races_remaining=5)
+    assert prediction_df[0, "predicted_total_points"] == pytest.approx(20.0)
+    
+    assert create_driver_dataframe([]).schema == df.schema
+
+
+def test_analyze_team_performance(sample_drivers_df):
     """Test analyzing team performance."""
-    drivers_df = create_driver_dataframe(sample_drivers)
+    drivers_df = sample_drivers_df
     performance_df = analyze_team_performance(drivers_df)
     
     assert isinstance(performance_df, pl.DataFrame)
@@ -137,9 +179,37 @@ def test_analyze_team_performance(sample_drivers):
     assert performance_df[0, "total_points"] == 430.0
 
 
-def test_analyze_price_to_points_correlation(sample_drivers):
+def test_analyze_team_performance_top_n(sample_drivers_df):
+    """Test that only the requested number of best teams is returned, in order."""
+    drivers_df = sample_drivers_df
+    
+    full_df = analyze_team_performance(drivers_df)
+    top_df = analyze_team_performance(drivers_df, top_n=2)
+    
+    assert top_df.equals(full_df.head(2))
+
+
+def test_analyze_team_performance_matches_eager_reference(sample_drivers_df):
+    """Test the unordered lazy aggregation against an eager, order-preserving reference."""
+    reference = (
+        sample_drivers_df
+        .group_by("team", maintain_order=True)
+        .agg([
+            pl.len().alias("driver_count"),
+            pl.sum("points").alias("total_points"),
+            pl.mean("points").alias("avg_points_per_driver"),
+            pl.sum("price").alias("total_price"),
+            pl.mean("form").alias("avg_form"),
+        ])
+        .sort("total_points", descending=True)
+    )
+    
+    assert_frame_equal(analyze_team_performance(sample_drivers_df), reference)
+
+
+def test_analyze_price_to_points_correlation(sample_drivers_df):
     """Test analyzing correlation between price and points."""
-    drivers_df = create_driver_dataframe(sample_drivers)
+    drivers_df = sample_drivers_df
     correlation = analyze_price_to_points_correlation(drivers_df)
     
     assert isinstance(correlation, dict)
@@ -149,9 +219,34 @@ def test_analyze_price_to_points_correlation(sample_drivers):
     assert correlation["correlation"] > 0.9  # Strong positive correlation expected
 
 
-def test_find_undervalued_drivers(sample_drivers):
+def test_price_to_points_regression_line():
+    """Test that the fitted line recovers an exact linear price/points relation."""
+    drivers_df = pl.DataFrame(
+        {"price": [5.0, 10.0, 20.0, 30.0], "points": [20.0, 45.0, 95.0, 145.0]}
+    )
+    correlation = analyze_price_to_points_correlation(drivers_df)
+    
+    assert correlation["correlation"] == pytest.approx(1.0)
+    assert correlation["slope"] == pytest.approx(5.0)
+    assert correlation["intercept"] == pytest.approx(-5.0)
+
+
+def test_corr_slope_intercept_matches_numpy(sample_drivers_df):
+    """Test the hand-rolled correlation and line fit against np.corrcoef and np.polyfit."""
+    x = sample_drivers_df["price"].to_numpy()
+    y = sample_drivers_df["points"].to_numpy()
+    
+    correlation, slope, intercept = polars_analysis._corr_slope_intercept(x, y)
+    expected_slope, expected_intercept = np.polyfit(x, y, 1)
+    
+    assert correlation == pytest.approx(np.corrcoef(x, y)[0, 1])
+    assert slope == pytest.approx(expected_slope)
+    assert intercept == pytest.approx(expected_intercept)
+
+
+def test_find_undervalued_drivers(sample_drivers_df):
     """Test finding undervalued drivers."""
-    drivers_df = create_driver_dataframe(sample_drivers)
+    drivers_df = sample_drivers_df
     undervalued_df = find_undervalued_drivers(drivers_df, threshold=0.0)
     
     assert isinstance(undervalued_df, pl.DataFrame)
@@ -161,9 +256,9 @@ def test_find_undervalued_drivers(sample_drivers):
     assert undervalued_df.shape[0] >= 1
 
 
-def test_predict_future_points(sample_drivers):
+def test_predict_future_points(sample_drivers_df):
     """Test predicting future points."""
-    drivers_df = create_driver_dataframe(sample_drivers)
+    drivers_df = sample_drivers_df
     prediction_df = predict_future_points(drivers_df, races_completed=5, races_remaining=5)
     
     assert isinstance(prediction_df, pl.DataFrame)
@@ -171,14 +266,37 @@ def test_predict_future_points(sample_drivers):
     assert "predicted_total_points" in prediction_df.columns
     
     # Predicted total points should be greater than current points
-    for i in range(len(sample_drivers)):
-        assert prediction_df[i, "predicted_total_points"] >= prediction_df[i, "points"]
+    assert prediction_df.height == sample_drivers_df.height
+    assert (prediction_df["predicted_total_points"] >= prediction_df["points"]).all()
+
+
+def test_predict_future_points_at_scale():
+    """Test predictions on a season-sized frame against the same formula in NumPy."""
+    rng = np.random.default_rng(7)
+    n = 10_000
+    points = rng.random(n) * 400
+    form = np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 5)
+    drivers_df = pl.DataFrame({
+        "id": np.arange(n),
+        "points": points,
+        "form": pl.Series(form, nan_to_null=True),
+    })
+    
+    prediction_df = predict_future_points(drivers_df, races_completed=8, races_remaining=16)
+    
+    future = points / 8 * np.nan_to_num(form, nan=1.0) * 16
+    order = np.argsort(-(points + future), kind="stable")
+    np.testing.assert_array_equal(prediction_df["id"].to_numpy(), order)
+    np.testing.assert_allclose(prediction_df["predicted_future_points"].to_numpy(), future[order])
+    np.testing.assert_allclose(
+        prediction_df["predicted_total_points"].to_numpy(), (points + future)[order]
+    )
 
 
-def test_optimize_team_selection_advanced(sample_drivers, sample_teams):
+def test_optimize_team_selection_advanced(sample_drivers_df, sample_teams_df):
     """Test advanced team selection optimization."""
-    drivers_df = create_driver_dataframe(sample_drivers)
-    teams_df = create_team_dataframe(sample_teams)
+    drivers_df = sample_drivers_df
+    teams_df = sample_teams_df
     
     selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
         drivers_df, teams_df, budget=100.0, max_drivers=3, max_per_team=1
@@ -187,15 +305,121 @@ def test_optimize_team_selection_advanced(sample_drivers, sample_teams):
     assert isinstance(selected_drivers_df, pl.DataFrame)
     assert selected_drivers_df.shape[0] <= 3  # At most 3 drivers
     
-    # Check team constraint
-    if not selected_drivers_df.is_empty():
-        # Get the count of drivers per team
-        team_counts_df = selected_drivers_df.group_by("team").agg(pl.count("id").alias("count"))
-        # Verify no team has more than max_per_team drivers
-        assert team_counts_df["count"].max() <= 1  # At most 1 driver per team
+    # Check team constraint: with max_per_team=1 every selected team is distinct
+    assert selected_drivers_df["team"].n_unique() == selected_drivers_df.height
     
     # Check budget constraint
-    total_cost = sum(selected_drivers_df["price"].to_list()) if not selected_drivers_df.is_empty() else 0.0
+    total_cost = selected_drivers_df["price"].sum()
     if selected_team:
         total_cost += selected_team["price"]
-    assert total_cost + remaining_budget == pytest.approx(100.0) 
\ No newline at end of file
+    assert total_cost + remaining_budget == pytest.approx(100.0) 
+
+
+def brute_force_best(drivers, teams, budget, max_drivers, max_per_team):
+    """Exhaustively search team and driver subsets within the team limit for the best points."""
+    best = 0.0
+    for team in teams:
+        for k in range(max_drivers + 1):
+            for combo in combinations(drivers, k):
+                if combo and max(Counter(d.team for d in combo).values()) > max_per_team:
+                    continue
+                cost = team.price + sum(d.price for d in combo)
+                if cost <= budget + 1e-9:
+                    best = max(best, team.points + sum(d.points for d in combo))
+    return best
+
+
+def test_optimize_team_selection_advanced_matches_brute_force(
+    sample_drivers, sample_drivers_df, sample_teams, sample_teams_df
+):
+    """Test that the constrained selection finds the exhaustive optimum."""
+    selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
+        sample_drivers_df, sample_teams_df, budget=100.0, max_drivers=3, max_per_team=1
+    )
+    
+    best = brute_force_best(sample_drivers, sample_teams, 100.0, 3, 1)
+    total_points = selected_team["points"] + selected_drivers_df["points"].sum()
+    assert total_points == pytest.approx(best)
+    assert selected_drivers_df["team"].n_unique() == selected_drivers_df.height
+    assert remaining_budget >= 0
+
+
+def test_optimize_team_selection_advanced_greedy_fallback(
+    sample_drivers, sample_drivers_df, sample_teams, sample_teams_df, monkeypatch
+):
+    """Test that the greedy fallback stays feasible and never trails the best single driver."""
+    monkeypatch.setattr(polars_analysis, "MAX_DP_CELLS", 0)
+    
+    for budget in (60.0, 80.0, 100.0):
+        selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
+            sample_drivers_df, sample_teams_df, budget=budget, max_drivers=3, max_per_team=1
+        )
+        
+        assert selected_drivers_df.height <= 3
+        assert selected_drivers_df["team"].n_unique() == selected_drivers_df.height
+        assert remaining_budget >= 0
+        total_points = selected_team["points"] + selected_drivers_df["points"].sum()
+        assert total_points <= brute_force_best(sample_drivers, sample_teams, budget, 3, 1)
+        driver_budget = budget - selected_team["price"]
+        best_single = max(d.points for d in sample_drivers if d.price <= driver_budget)
+        assert selected_drivers_df["points"].sum() >= best_single
+
+
+def test_greedy_fallback_takes_best_single_driver(monkeypatch):
+    """Test that one high scorer beats a greedy pick of cheaper, better-value drivers."""
+    drivers_df = create_driver_dataframe([
+        Driver(id=1, name="Oliver Bearman", team="Haas", price=1.0, points=2.0),
+        Driver(id=2, name="Max Verstappen", team="Red Bull Racing", price=10.0, points=15.0),
+    ])
+    teams_df = create_team_dataframe([Team(id=1, name="Haas", price=0.0, points=0.0)])
+    monkeypatch.setattr(polars_analysis, "MAX_DP_CELLS", 0)
+    
+    selected_drivers_df, _, remaining_budget = optimize_team_selection_advanced(
+        drivers_df, teams_df, budget=10.0, max_drivers=2, max_per_team=1
+    )
+    
+    assert selected_drivers_df["id"].to_list() == [2]
+    assert remaining_budget == pytest.approx(0.0)
+
+
+def test_optimize_team_selection_advanced_two_decimal_prices():
+    """Test that prices finer than one decimal place never push the team over budget."""
+    drivers_df = create_driver_dataframe([
+        Driver(id=1, name="Pierre Gasly", team="Alpine", price=10.25, points=100.0),
+        Driver(id=2, name="Yuki Tsunoda", team="RB", price=10.2, points=90.0),
+        Driver(id=3, name="Oliver Bearman", team="Haas", price=10.15, points=50.0),
+    ])
+    teams_df = create_team_dataframe([
+        Team(id=1, name="Haas", price=0.05, points=10.0),
+    ])
+    
+    selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
+        drivers_df, teams_df, budget=20.45, max_drivers=2, max_per_team=1
+    )
+    
+    assert selected_team["name"] == "Haas"
+    assert selected_drivers_df["id"].to_list() == [1, 3]
+    assert remaining_budget == pytest.approx(0.0)
+
+
+def test_optimize_team_selection_advanced_bounds_options_before_enumerating(monkeypatch):
+    """Test that one oversized team falls back to greedy without enumerating its options."""
+    drivers_df = create_driver_dataframe([
+        Driver(id=i, name=f"Driver {i}", team="Unknown", price=5.0, points=float(i))
+        for i in range(1, 41)
+    ])
+    teams_df = create_team_dataframe([Team(id=1, name="Unknown", price=10.0, points=50.0)])
+    monkeypatch.setattr(polars_analysis, "MAX_DP_CELLS", 1_000)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("options should not be enumerated")
+    
+    monkeypatch.setattr(polars_analysis, "combinations", fail)
+    
+    selected_drivers_df, selected_team, remaining_budget = optimize_team_selection_advanced(
+        drivers_df, teams_df, budget=100.0, max_drivers=5, max_per_team=5
+    )
+    
+    assert selected_team["name"] == "Unknown"
+    assert selected_drivers_df.height == 5
+    assert remaining_budget == pytest.approx(65.0)
@@ -1,153 +1,386 @@
-#!/usr/bin/env python3
 """
 Test script for the F1 Fantasy prices module.
 """
 
+import gc
 import os
-import sys
-import unittest
+import shutil
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 
-# Add the project root to the Python path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
+from backend.data import prices as prices_module
 from backend.data.prices import Prices
 
-class TestPrices(unittest.TestCase):
-    """Test cases for the Prices class."""
+
+@pytest.fixture(scope="session")
+def prices():
+    """Share one Prices instance across the tests and close its connection at the end."""
+    shared = Prices()
+    yield shared
+    shared.close()
+
+
+@pytest.fixture(scope="session")
+def first_driver(prices):
+    """Look up the first driver once for the single-driver tests."""
+    return prices.get_all_drivers()[0]
+
+
+@pytest.fixture(scope="session")
+def first_team(prices):
+    """Look up the first team once for the single-team tests."""
+    return prices.get_all_teams()[0]
+
+
+def test_initialization(prices):
+    """Test that the Prices class can be initialized."""
+    assert isinstance(prices, Prices)
+
+
+def test_connection_pool(prices):
+    """Test that Prices instances share a pooled connection until the pool is closed."""
+    conn = prices._get_connection()
+    assert Prices()._get_connection() is conn
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+    assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2
     
-    def setUp(self):
-        """Set up the test environment."""
-        self.prices = Prices()
+    Prices.close_pool()
+    assert prices._get_connection() is not conn
+    assert len(prices.get_all_teams()) > 0
+
+
+def test_context_manager_releases_connection(prices):
+    """Test that leaving a with block releases the connection without closing it for others."""
+    conn = prices._get_connection()
+    with Prices() as other:
+        assert other._get_connection() is conn
+        assert len(other.get_all_drivers()) > 0
     
-    def test_initialization(self):
-        """Test that the Prices class can be initialized."""
-        self.assertIsInstance(self.prices, Prices)
+    assert prices._get_connection() is conn
+    assert len(prices.get_all_teams()) > 0
     
-    def test_get_all_drivers(self):
-        """Test getting all drivers."""
-        drivers = self.prices.get_all_drivers()
-        self.assertIsInstance(drivers, list)
-        self.assertGreater(len(drivers), 0)
-        
-        # Check the structure of the driver data
-        driver = drivers[0]
-        self.assertIn('id', driver)
-        self.assertIn('name', driver)
-        self.assertIn('team', driver)
-    
-    def test_get_all_teams(self):
-        """Test getting all teams."""
-        teams = self.prices.get_all_teams()
-        self.assertIsInstance(teams, list)
-        self.assertGreater(len(teams), 0)
-        
-        # Check the structure of the team data
-        team = teams[0]
-        self.assertIn('id', team)
-        self.assertIn('name', team)
-    
-    def test_get_all_drivers_with_prices(self):
-        """Test getting all drivers with prices."""
-        drivers = self.prices.get_all_drivers_with_prices()
-        self.assertIsInstance(drivers, list)
-        self.assertGreater(len(drivers), 0)
-        
-        # Check the structure of the driver data
-        driver = drivers[0]
-        self.assertIn('id', driver)
-        self.assertIn('name', driver)
-        self.assertIn('team', driver)
-        self.assertIn('price', driver)
-    
-    def test_get_all_teams_with_prices(self):
-        """Test getting all teams with prices."""
-        teams = self.prices.get_all_teams_with_prices()
-        self.assertIsInstance(teams, list)
-        self.assertGreater(len(teams), 0)
-        
-        # Check the structure of the team data
-        team = teams[0]
-        self.assertIn('id', team)
-        self.assertIn('name', team)
-        self.assertIn('price', team)
-    
-    def test_get_driver_by_name(self):
-        """Test getting a driver by name."""
-        # Get the first driver from the list
-        drivers = self.prices.get_all_drivers()
-        first_driver_name = drivers[0]['name']
-        
-        # Get the driver by name
-        driver = self.prices.get_driver_by_name(first_driver_name)
-        self.assertEqual(driver['name'], first_driver_name)
-    
-    def test_get_team_by_name(self):
-        """Test getting a team by name."""
-        # Get the first team from the list
-        teams = self.prices.get_all_teams()
-        first_team_name = teams[0]['name']
-        
-        # Get the team by name
-        team = self.prices.get_team_by_name(first_team_name)
-        self.assertEqual(team['name'], first_team_name)
-    
-    def test_get_driver_price(self):
-        """Test getting a driver's price."""
-        # Get the first driver from the list
-        drivers = self.prices.get_all_drivers()
-        driver_id = drivers[0]['id']
-        
-        # Get the driver's price
-        price = self.prices.get_driver_price(driver_id)
-        self.assertIsInstance(price, (int, float))
-    
-    def test_get_team_price(self):
-        """Test getting a team's price."""
-        # Get the first team from the list
-        teams = self.prices.get_all_teams()
-        team_id = teams[0]['id']
-        
-        # Get the team's price
-        price = self.prices.get_team_price(team_id)
-        self.assertIsInstance(price, (int, float))
-    
-    def test_get_driver_price_history(self):
-        """Test getting a driver's price history."""
-        # Get the first driver from the list
-        drivers = self.prices.get_all_drivers()
-        driver_id = drivers[0]['id']
+    with Prices(readonly=True) as readonly:
+        readonly_conn = readonly._get_connection()
+    with pytest.raises(sqlite3.ProgrammingError):
+        readonly_conn.execute('SELECT 1')
+
+
+def test_connection_per_thread(prices):
+    """Test that each thread gets its own connection and concurrent reads see every row."""
+    driver_count = len(prices.get_all_drivers_with_prices())
+    team_count = len(prices.get_all_teams_with_prices())
+    
+    def read_prices(_):
+        counts = set()
+        for _ in range(20):
+            counts.add((len(prices.get_all_drivers_with_prices()),
+                        len(prices.get_all_teams_with_prices())))
+        return prices._get_connection(), counts
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(read_prices, range(8)))
+    
+    assert all(counts == {(driver_count, team_count)} for _, counts in results)
+    assert prices._get_connection() not in {conn for conn, _ in results}
+
+
+def test_exited_thread_connection_is_closed(prices):
+    """Test that a thread's pooled connection is closed and dropped when the thread exits."""
+    opened = []
+    worker = threading.Thread(target=lambda: opened.append(prices._get_connection()))
+    worker.start()
+    worker.join()
+    gc.collect()
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute('SELECT 1')
+    assert all(pooled.conn is not opened[0] for pooled in prices_module._OPEN_CONNECTIONS)
+
+
+def test_readonly_connection(prices):
+    """Test that a read-only instance reads prices but cannot write them."""
+    with Prices(readonly=True) as readonly:
+        conn = readonly._get_connection()
+        assert conn is not prices._get_connection()
+        assert conn.execute('PRAGMA mmap_size').fetchone()[0] > 0
+        assert readonly.get_all_drivers_with_prices() == prices.get_all_drivers_with_prices()
+        with pytest.raises(sqlite3.OperationalError):
+            readonly.add_team_price(readonly.get_all_teams()[0]['id'], 1.0, datetime(2100, 1, 1))
+
+
+def test_get_all_drivers(prices):
+    """Test getting all drivers."""
+    drivers = prices.get_all_drivers()
+    assert isinstance(drivers, list)
+    assert len(drivers) > 0
+    
+    # Check the structure of the driver data
+    driver = drivers[0]
+    assert 'id' in driver
+    assert 'name' in driver
+    assert 'team' in driver
+
+
+def test_get_all_teams(prices):
+    """Test getting all teams."""
+    teams = prices.get_all_teams()
+    assert isinstance(teams, list)
+    assert len(teams) > 0
+    
+    # Check the structure of the team data
+    team = teams[0]
+    assert 'id' in team
+    assert 'name' in team
+
+
+def test_get_all_drivers_with_prices(prices):
+    """Test getting all drivers with prices."""
+    drivers = prices.get_all_drivers_with_prices()
+    assert isinstance(drivers, list)
+    assert len(drivers) > 0
+    
+    # Check the structure of the driver data
+    driver = drivers[0]
+    assert 'id' in driver
+    assert 'name' in driver
+    assert 'team' in driver
+    assert 'price' in driver
+
+
+def test_get_all_teams_with_prices(prices):
+    """Test getting all teams with prices."""
+    teams = prices.get_all_teams_with_prices()
+    assert isinstance(teams, list)
+    assert len(teams) > 0
+    
+    # Check the structure of the team data
+    team = teams[0]
+    assert 'id' in team
+    assert 'name' in team
+    assert 'price' in team
+
+
+def test_get_driver_by_name(prices, first_driver):
+    """Test getting a driver by name."""
+    first_driver_name = first_driver['name']
+    
+    # Get the driver by name
+    driver = prices.get_driver_by_name(first_driver_name)
+    assert driver['name'] == first_driver_name
+
+
+def test_get_team_by_name(prices, first_team):
+    """Test getting a team by name."""
+    first_team_name = first_team['name']
+    
+    # Get the team by name
+    team = prices.get_team_by_name(first_team_name)
+    assert team['name'] == first_team_name
+
+
+def test_name_lookup_cache(prices):
+    """Test that name lookups are served from memory and return independent copies."""
+    drivers = prices.get_all_drivers()
+    name = drivers[0]['name']
+    
+    driver = prices.get_driver_by_name(name)
+    driver['name'] = 'changed'
+    assert len(prices._driver_name_cache) == len(drivers)
+    assert prices.get_driver_by_name(name)['name'] == name
+    
+    prices.clear_name_cache()
+    assert prices._driver_name_cache == {}
+    with pytest.raises(ValueError):
+        prices.get_team_by_name('Not A Team')
+    assert 'Not A Team' not in prices._team_name_cache
+
+
+def test_name_lookup_misses_are_not_cached(prices):
+    """Test that a name that was not found is looked up again on the next call."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'f1_fantasy.db')
+        shutil.copy(prices.db_path, db_path)
         
-        # Get the driver's price history
-        history = self.prices.get_driver_price_history(driver_id)
-        self.assertIsInstance(history, list)
-        self.assertGreater(len(history), 0)
+        with Prices(db_path) as db_copy:
+            with pytest.raises(ValueError):
+                db_copy.get_team_by_name('Late Team')
+            
+            with db_copy._get_connection() as conn:
+                conn.execute("INSERT INTO teams (name) VALUES ('Late Team')")
+            
+            assert db_copy.get_team_by_name('Late Team')['name'] == 'Late Team'
+
+
+def test_name_lookup_finds_names_added_later(prices):
+    """Test that names inserted after the name cache was loaded are still found."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'f1_fantasy.db')
+        shutil.copy(prices.db_path, db_path)
         
-        # Check the structure of the history data
-        entry = history[0]
-        self.assertIn('price', entry)
-        self.assertIn('date', entry)
-    
-    def test_get_team_price_history(self):
-        """Test getting a team's price history."""
-        # Get the first team from the list
-        teams = self.prices.get_all_teams()
-        team_id = teams[0]['id']
+        with Prices(db_path) as db_copy:
+            team = db_copy.get_team_by_name(db_copy.get_all_teams()[0]['name'])
+            db_copy.get_driver_by_name(db_copy.get_all_drivers()[0]['name'])
+            
+            with db_copy._get_connection() as conn:
+                conn.execute("INSERT INTO teams (name) VALUES ('New Team')")
+                conn.execute(
+                    "INSERT INTO drivers (name, team_id) VALUES ('New Driver', ?)", (team['id'],)
+                )
+            
+            assert db_copy.get_team_by_name('New Team')['name'] == 'New Team'
+            assert db_copy.get_driver_by_name('New Driver')['team'] == team['name']
+
+
+def test_get_ids_by_name(prices):
+    """Test looking up many driver and team IDs at once."""
+    drivers = prices.get_all_drivers()
+    names = [driver['name'] for driver in drivers] + ['Not A Driver']
+    
+    ids = prices.get_driver_ids_by_name(names)
+    assert ids == {driver['name']: driver['id'] for driver in drivers}
+    
+    teams = prices.get_all_teams()
+    ids = prices.get_team_ids_by_name(team['name'] for team in teams)
+    assert ids == {team['name']: team['id'] for team in teams}
+
+
+def test_get_driver_price(prices, first_driver):
+    """Test getting a driver's price."""
+    driver_id = first_driver['id']
+    
+    # Get the driver's price
+    price = prices.get_driver_price(driver_id)
+    assert isinstance(price, (int, float))
+
+
+def test_get_team_price(prices, first_team):
+    """Test getting a team's price."""
+    team_id = first_team['id']
+    
+    # Get the team's price
+    price = prices.get_team_price(team_id)
+    assert isinstance(price, (int, float))
+
+
+def test_latest_prices_match_history(prices):
+    """Test that cached latest prices agree with the end of each price history."""
+    for driver in prices.get_all_drivers():
+        history = prices.get_driver_price_history(driver['id'])
+        assert prices.get_driver_price(driver['id']) == history[-1]['price']
+    
+    for team in prices.get_all_teams():
+        history = prices.get_team_price_history(team['id'])
+        assert prices.get_team_price(team['id']) == history[-1]['price']
+    
+    prices.invalidate_price_cache()
+    with pytest.raises(ValueError):
+        prices.get_driver_price(-1)
+
+
+def test_listings_match_latest_prices(prices):
+    """Test that the bulk listings read the same latest prices as single lookups."""
+    for driver in prices.get_all_drivers_with_prices():
+        assert driver['price'] == prices.get_driver_price(driver['id'])
+    
+    for team in prices.get_all_teams_with_prices():
+        assert team['price'] == prices.get_team_price(team['id'])
+
+
+def test_prices_frames_match_listings(prices):
+    """Test that the DataFrame listings hold the same rows as the dict listings."""
+    drivers = prices.get_drivers_with_prices_frame()
+    assert drivers.columns == ['id', 'name', 'team', 'price']
+    assert drivers.to_dicts() == prices.get_all_drivers_with_prices()
+    
+    teams = prices.get_teams_with_prices_frame(datetime(1900, 1, 1))
+    assert teams.columns == ['id', 'name', 'price']
+    assert teams.to_dicts() == prices.get_all_teams_with_prices(datetime(1900, 1, 1))
+
+
+def test_prices_at_date(prices):
+    """Test that dated listings return the price in effect at that date, if any."""
+    later = datetime(2100, 1, 1)
+    for driver in prices.get_all_drivers_with_prices(later):
+        assert driver['price'] == prices.get_driver_price(driver['id'], later)
+    
+    for team in prices.get_all_teams_with_prices(later):
+        assert team['price'] == prices.get_team_price(team['id'], later)
+    
+    earlier = datetime(1900, 1, 1)
+    assert all(d['price'] is None for d in prices.get_all_drivers_with_prices(earlier))
+    assert all(t['price'] is None for t in prices.get_all_teams_with_prices(earlier))
+
+
+def test_add_prices(prices):
+    """Test that bulk-added prices become the latest prices, on a copy of the database."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'f1_fantasy.db')
+        shutil.copy(prices.db_path, db_path)
         
-        # Get the team's price history
-        history = self.prices.get_team_price_history(team_id)
-        self.assertIsInstance(history, list)
-        self.assertGreater(len(history), 0)
+        with Prices(db_path) as db_copy:
+            drivers = db_copy.get_all_drivers()
+            effective_date = datetime(2100, 1, 1)
+            db_copy.add_driver_prices(
+                (driver['id'], 99.0 + i, effective_date) for i, driver in enumerate(drivers)
+            )
+            team_id = db_copy.get_all_teams()[0]['id']
+            db_copy.add_team_price(team_id, 42.0, effective_date)
+            
+            for i, driver in enumerate(drivers):
+                assert db_copy.get_driver_price(driver['id']) == 99.0 + i
+            assert db_copy.get_team_price(team_id) == 42.0
+
+
+def test_latest_prices_see_other_writers(prices):
+    """Test that cached latest prices pick up prices added by other instances and threads."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'f1_fantasy.db')
+        shutil.copy(prices.db_path, db_path)
         
-        # Check the structure of the history data
-        entry = history[0]
-        self.assertIn('price', entry)
-        self.assertIn('date', entry)
+        with Prices(db_path) as reader, Prices(db_path) as writer:
+            driver_id = reader.get_all_drivers()[0]['id']
+            team_id = reader.get_all_teams()[0]['id']
+            reader.get_driver_price(driver_id)
+            reader.get_team_price(team_id)
+            
+            writer.add_driver_price(driver_id, 77.0, datetime(2100, 1, 1))
+            assert reader.get_driver_price(driver_id) == 77.0
+            
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(writer.add_team_price, team_id, 55.0, datetime(2100, 1, 1)).result()
+            assert reader.get_team_price(team_id) == 55.0
 
-def run_tests():
-    """Run the tests."""
-    unittest.main()
 
-if __name__ == "__main__":
-    run_tests() 
\ No newline at end of file
+def test_get_driver_price_history(prices, first_driver):
+    """Test getting a driver's price history."""
+    driver_id = first_driver['id']
+    
+    # Get the driver's price history
+    history = prices.get_driver_price_history(driver_id)
+    assert isinstance(history, list)
+    assert len(history) > 0
+    
+    # Check the structure of the history data
+    entry = history[0]
+    assert 'price' in entry
+    assert 'date' in entry
+
+
+def test_get_team_price_history(prices, first_team):
+    """Test getting a team's price history."""
+    team_id = first_team['id']
+    
+    # Get the team's price history
+    history = prices.get_team_price_history(team_id)
+    assert isinstance(history, list)
+    assert len(history) > 0
+    
+    # Check the structure of the history data
+    entry = history[0]
+    assert 'price' in entry
+    assert 'date' in entry
@@ -3,17 +3,24 @@
 Test script for the F1 Fantasy scoring rules module.
 """
 
-import os
-import sys
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
-# Add the project root directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
 
-from backend.data.scoring_rules import get_scoring_rules
+from backend.data.scoring_rules import ScoringRules, get_scoring_rules
 
-def test_scoring_categories():
+
+@pytest.fixture(scope="session")
+def scoring_rules():
+    """Share the ScoringRules singleton across tests and close its connection at the end."""
+    rules = get_scoring_rules()
+    yield rules
+    rules.close()
+
+def test_scoring_categories(scoring_rules):
     """Test retrieving scoring categories."""
-    scoring_rules = get_scoring_rules()
     categories = scoring_rules.get_categories()
     
     print("Scoring Categories:")
@@ -22,9 +29,8 @@ def test_scoring_categories():
     
     assert len(categories) > 0, "No scoring categories found"
 
-def test_scoring_rules():
+def test_scoring_rules(scoring_rules):
     """Test retrieving scoring rules."""
-    scoring_rules = get_scoring_rules()
     rules = scoring_rules.get_scoring_rules()
     
     print("\nScoring Rules:")
@@ -33,9 +39,8 @@ def test_scoring_rules():
     
     assert len(rules) > 0, "No scoring rules found"
 
-def test_qualifying_position_points():
+def test_qualifying_position_points(scoring_rules):
     """Test retrieving qualifying position points."""
-    scoring_rules = get_scoring_rules()
     points = scoring_rules.get_qualifying_position_points()
     
     print("\nQualifying Position Points:")
@@ -49,9 +54,8 @@ def test_qualifying_position_points():
     print(f"\nPoints for P1 in qualifying: {p1_points}")
     assert p1_points == 10, f"Expected 10 points for P1 in qualifying, got {p1_points}"
 
-def test_race_position_points():
+def test_race_position_points(scoring_rules):
     """Test retrieving race position points."""
-    scoring_rules = get_scoring_rules()
     points = scoring_rules.get_race_position_points()
     
     print("\nRace Position Points:")
@@ -65,9 +69,68 @@ def test_race_position_points():
     print(f"\nPoints for P1 in race: {p1_points}")
     assert p1_points == 25, f"Expected 25 points for P1 in race, got {p1_points}"
 
-def test_constructor_rules():
+def test_position_points_cache(scoring_rules):
+    """Test that single-position lookups are served from the cached tables."""
+    scoring_rules.clear_cache()
+    
+    all_points = scoring_rules.get_race_position_points()
+    for p in all_points:
+        assert scoring_rules.get_race_position_points(p.position) == p.points
+    assert scoring_rules.get_race_position_points(99) == 0
+    assert 'race_position_points' in scoring_rules._position_points_cache
+    
+    scoring_rules.clear_cache()
+    assert scoring_rules._position_points_cache == {}
+
+def test_rules_cache(scoring_rules):
+    """Test that rule lists are loaded once and filtered in memory."""
+    scoring_rules.clear_cache()
+    
+    rules = scoring_rules.get_scoring_rules()
+    rules.clear()
+    assert len(scoring_rules.get_scoring_rules()) > 0
+    assert 'scoring_rules' in scoring_rules._rules_cache
+    
+    for category in scoring_rules.get_categories():
+        filtered = scoring_rules.get_scoring_rules(category.id)
+        assert all(rule.category_id == category.id for rule in filtered)
+    
+    scoring_rules.clear_cache()
+    assert scoring_rules._rules_cache == {}
+
+def test_context_manager_shares_connection():
+    """Test that one connection serves every lookup in a with block and is then closed."""
+    with ScoringRules() as scoring_rules:
+        conn = scoring_rules._get_connection()
+        scoring_rules.get_categories()
+        scoring_rules.calculate_driver_points(
+            qualifying_position=2, race_position=3, grid_position=2
+        )
+        assert scoring_rules._get_connection() is conn
+    
+    assert scoring_rules._conn is None
+
+def test_connection_is_read_only():
+    """Test that the scoring rules connection cannot modify the database."""
+    with ScoringRules() as scoring_rules:
+        conn = scoring_rules._get_connection()
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('DELETE FROM scoring_categories')
+        assert len(scoring_rules.get_categories()) > 0
+
+def test_singleton_shared_across_threads():
+    """Test that concurrent first calls share one instance usable from any thread."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        instances = list(executor.map(lambda _: get_scoring_rules(), range(16)))
+        points = list(executor.map(
+            lambda rules: rules.get_race_position_points(1), instances
+        ))
+    
+    assert all(instance is instances[0] for instance in instances)
+    assert points == [25] * len(instances)
+
+def test_constructor_rules(scoring_rules):
     """Test retrieving constructor rules."""
-    scoring_rules = get_scoring_rules()
     rules = scoring_rules.get_constructor_rules()
     
     print("\nConstructor Rules:")
@@ -76,9 +139,8 @@ def test_constructor_rules():
     
     assert len(rules) > 0, "No constructor rules found"
 
-def test_price_change_rules():
+def test_price_change_rules(scoring_rules):
     """Test retrieving price change rules."""
-    scoring_rules = get_scoring_rules()
     rules = scoring_rules.get_price_change_rules()
     
     print("\nPrice Change Rules:")
@@ -87,72 +149,107 @@ def test_price_change_rules():
     
     assert len(rules) > 0, "No price change rules found"
 
-def test_calculate_driver_points():
+# Driver scoring scenarios as (calculate_driver_points arguments, expected total)
+DRIVER_POINTS_CASES = [
+    # Race winner with fastest lap
+    (dict(qualifying_position=1, race_position=1, grid_position=1, finished_race=True,
+          fastest_lap=True, q3_appearance=True, driver_of_day=True,
+          beat_teammate_qualifying=True, beat_teammate_race=True), 58),
+    # DNF from a good position (a DNF is usually classified in last position)
+    (dict(qualifying_position=3, race_position=20, grid_position=3, finished_race=False,
+          q3_appearance=True, beat_teammate_qualifying=True), -4),
+    # Midfield driver with good recovery
+    (dict(qualifying_position=15, race_position=10, grid_position=15, finished_race=True,
+          beat_teammate_qualifying=False, beat_teammate_race=True), 15),
+]
+
+@pytest.mark.parametrize('kwargs, expected_points', DRIVER_POINTS_CASES)
+def test_calculate_driver_points(kwargs, expected_points, scoring_rules):
     """Test calculating driver points."""
-    scoring_rules = get_scoring_rules()
-    
-    # Test case 1: Race winner with fastest lap
-    total_points, breakdown = scoring_rules.calculate_driver_points(
-        qualifying_position=1,
-        race_position=1,
-        grid_position=1,
-        finished_race=True,
-        fastest_lap=True,
-        q3_appearance=True,
-        driver_of_day=True,
-        beat_teammate_qualifying=True,
-        beat_teammate_race=True
+    total_points, breakdown = scoring_rules.calculate_driver_points(**kwargs)
+    
+    assert total_points == expected_points
+    assert sum(breakdown.values()) == total_points
+
+def test_calculate_driver_points_without_breakdown(scoring_rules):
+    """Test that skipping the breakdown leaves the total unchanged."""
+    kwargs = dict(qualifying_position=12, race_position=8, grid_position=20,
+                  q2_appearance=True, beat_teammate_race=True)
+    
+    total_points, breakdown = scoring_rules.calculate_driver_points(**kwargs)
+    fast_total, fast_breakdown = scoring_rules.calculate_driver_points(
+        include_breakdown=False, **kwargs
     )
     
-    print("\nTest Case 1: Race winner with fastest lap")
-    print(f"Total points: {total_points}")
-    print("Points breakdown:")
-    for category, points in breakdown.items():
-        print(f"  {category}: {points}")
-    
-    # Test case 2: DNF from a good position
-    total_points, breakdown = scoring_rules.calculate_driver_points(
-        qualifying_position=3,
-        race_position=20,  # DNF is usually classified in last position
-        grid_position=3,
-        finished_race=False,
-        q3_appearance=True,
-        beat_teammate_qualifying=True
+    assert fast_total == total_points == sum(breakdown.values())
+    assert fast_breakdown == {}
+
+def test_calculate_driver_points_batch(scoring_rules):
+    """Test that batch scoring matches scoring each driver individually."""
+    cases = [
+        dict(qualifying_position=1, race_position=1, grid_position=1, fastest_lap=True,
+             q3_appearance=True, driver_of_day=True, beat_teammate_qualifying=True,
+             beat_teammate_race=True),
+        dict(qualifying_position=3, race_position=20, grid_position=3, finished_race=False,
+             q3_appearance=True, beat_teammate_qualifying=True),
+        dict(qualifying_position=15, race_position=10, grid_position=15, beat_teammate_race=True),
+        dict(qualifying_position=12, race_position=8, grid_position=20, q2_appearance=True),
+        dict(qualifying_position=5, race_position=2, grid_position=5, disqualified=True,
+             q3_appearance=True, q2_appearance=True),
+    ]
+    flags = ['finished_race', 'fastest_lap', 'q3_appearance', 'q2_appearance', 'driver_of_day',
+             'beat_teammate_qualifying', 'beat_teammate_race', 'disqualified']
+    defaults = {flag: flag == 'finished_race' for flag in flags}
+    
+    batch_points = scoring_rules.calculate_driver_points_batch(
+        qualifying_positions=[case['qualifying_position'] for case in cases],
+        race_positions=[case['race_position'] for case in cases],
+        grid_positions=[case['grid_position'] for case in cases],
+        **{flag: [case.get(flag, defaults[flag]) for case in cases] for flag in flags}
     )
     
-    print("\nTest Case 2: DNF from a good position")
-    print(f"Total points: {total_points}")
-    print("Points breakdown:")
-    for category, points in breakdown.items():
-        print(f"  {category}: {points}")
-    
-    # Test case 3: Midfield driver with good recovery
-    total_points, breakdown = scoring_rules.calculate_driver_points(
-        qualifying_position=15,
-        race_position=10,
-        grid_position=15,
-        finished_race=True,
-        beat_teammate_qualifying=False,
-        beat_teammate_race=True
+    expected = [scoring_rules.calculate_driver_points(**case)[0] for case in cases]
+    assert batch_points.tolist() == expected
+    
+    # The position lookup tables are built once and reused
+    race_table = scoring_rules._get_position_points_table('race_position_points')
+    assert scoring_rules._get_position_points_table('race_position_points') is race_table
+
+def test_calculate_driver_points_batch_random_outcomes(scoring_rules):
+    """Test that batch scoring matches the scalar rules over many random race outcomes."""
+    rng = np.random.default_rng(2024)
+    n = 2000
+    qualifying_positions = rng.integers(1, 23, n)
+    race_positions = rng.integers(1, 23, n)
+    grid_positions = rng.integers(1, 23, n)
+    flags = {flag: rng.random(n) < 0.3 for flag in [
+        'finished_race', 'fastest_lap', 'q3_appearance', 'q2_appearance', 'driver_of_day',
+        'beat_teammate_qualifying', 'beat_teammate_race', 'disqualified']}
+    
+    batch_points = scoring_rules.calculate_driver_points_batch(
+        qualifying_positions, race_positions, grid_positions, **flags
     )
     
-    print("\nTest Case 3: Midfield driver with good recovery")
-    print(f"Total points: {total_points}")
-    print("Points breakdown:")
-    for category, points in breakdown.items():
-        print(f"  {category}: {points}")
+    expected = [
+        scoring_rules.calculate_driver_points(
+            int(qualifying_positions[i]), int(race_positions[i]), int(grid_positions[i]),
+            include_breakdown=False, **{flag: bool(values[i]) for flag, values in flags.items()}
+        )[0]
+        for i in range(n)
+    ]
+    np.testing.assert_array_equal(batch_points, expected)
 
 if __name__ == "__main__":
-    # Run all tests
-    test_scoring_categories()
-    test_scoring_rules()
-    test_qualifying_position_points()
-    test_race_position_points()
-    test_constructor_rules()
-    test_price_change_rules()
-    test_calculate_driver_points()
+    # Run all tests, closing the database connection when done
+    with get_scoring_rules() as scoring_rules:
+        test_scoring_categories(scoring_rules)
+        test_scoring_rules(scoring_rules)
+        test_qualifying_position_points(scoring_rules)
+        test_race_position_points(scoring_rules)
+        test_constructor_rules(scoring_rules)
+        test_price_change_rules(scoring_rules)
+        for kwargs, expected_points in DRIVER_POINTS_CASES:
+            test_calculate_driver_points(kwargs, expected_points, scoring_rules)
+        test_calculate_driver_points_batch(scoring_rules)
     
     print("\nAll tests passed!")
-    
-    # Close the database connection
-    get_scoring_rules().close() 
\ No newline at end of file